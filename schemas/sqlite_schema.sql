@@ -87,8 +87,10 @@ CREATE TABLE IF NOT EXISTS prompt_injections (
   source TEXT
 );
 
+-- decision_id aliases the rowid and is assigned by SQLite; created_at is
+-- milliseconds since the Unix epoch.
 CREATE TABLE IF NOT EXISTS attacker_decisions (
-  decision_id TEXT PRIMARY KEY,
+  decision_id INTEGER PRIMARY KEY,
   scenario_id TEXT NOT NULL,
   step INTEGER NOT NULL,
   attacker_state TEXT NOT NULL,
@@ -97,12 +99,17 @@ CREATE TABLE IF NOT EXISTS attacker_decisions (
   decision_json TEXT NOT NULL,
   model TEXT NOT NULL,
   temperature REAL NOT NULL,
-  created_at TEXT NOT NULL
+  created_at INTEGER NOT NULL
 );
 
 CREATE UNIQUE INDEX IF NOT EXISTS idx_attacker_cache
   ON attacker_decisions (scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash);
 
+-- Covers replay lookups: decision_json is read from the index without a
+-- second seek into the table.
+CREATE INDEX IF NOT EXISTS idx_attacker_cache_cover
+  ON attacker_decisions (scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash, decision_json);
+
 CREATE TABLE IF NOT EXISTS agent_actions (
   action_id TEXT PRIMARY KEY,
   scenario_id TEXT NOT NULL,
@@ -113,8 +120,10 @@ CREATE TABLE IF NOT EXISTS agent_actions (
   created_at TEXT NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_email_logs_scenario_step ON email_logs (scenario_id, step);
+-- email_id/alert_id are included so the per-step id lookups made on every
+-- environment step are answered from the index alone.
+CREATE INDEX IF NOT EXISTS idx_email_logs_scenario_step ON email_logs (scenario_id, step, email_id);
 CREATE INDEX IF NOT EXISTS idx_auth_logs_scenario_step ON auth_logs (scenario_id, step);
 CREATE INDEX IF NOT EXISTS idx_netflow_scenario_step ON netflow (scenario_id, step);
 CREATE INDEX IF NOT EXISTS idx_process_events_scenario_step ON process_events (scenario_id, step);
-CREATE INDEX IF NOT EXISTS idx_alerts_scenario_step ON alerts (scenario_id, step);
+CREATE INDEX IF NOT EXISTS idx_alerts_scenario_step ON alerts (scenario_id, step, alert_id);
@@ -12,7 +12,16 @@ import yaml
 
 from openai import OpenAI, BadRequestError
 
-from eval_utils import extract_json, injection_evidence_ids, load_env, load_json
+from eval_utils import (
+    dump_json,
+    extract_json,
+    import_pyarrow,
+    injection_evidence_ids,
+    load_env,
+    load_json,
+    trace_summary_record,
+    write_trace_parquet,
+)
 from oracle.calibration import (
     EvidenceExtraction,
     collect_known_entities,
@@ -260,7 +269,15 @@ def main() -> int:
     parser.add_argument("--max-steps", type=int, default=15)
     parser.add_argument("--output", default="outputs/llm_baselines.jsonl")
     parser.add_argument("--summary", default="outputs/llm_baselines_summary.json")
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Also write summary columns to a .parquet file next to --output",
+    )
     args = parser.parse_args()
+    if args.parquet:
+        # Fail before any model is called, not after the whole run
+        import_pyarrow()
 
     load_env()
 
@@ -284,6 +301,7 @@ def main() -> int:
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     summary: Dict[str, Any] = {}
+    trace_rows: List[Dict[str, Any]] = []
 
     with output_path.open("w") as f:
         for model_cfg in model_list:
@@ -341,6 +359,8 @@ def main() -> int:
                 }
                 f.write(json.dumps(row) + "\n")
                 f.flush()
+                if args.parquet:
+                    trace_rows.append(trace_summary_record(row))
                 print(
                     f"[{idx}/{len(seeds)}] {model_cfg['name']} {seed_path.name} "
                     f"reward={score.reward:.2f} containment={result['diagnostics']['containment_attempted']}",
@@ -376,8 +396,12 @@ def main() -> int:
                     "injection_violation_rate": injection_violation_count / len(rewards),
                 }
 
-    Path(args.summary).write_text(json.dumps(summary, indent=2))
+    Path(args.summary).write_bytes(dump_json(summary))
     print(f"OK: wrote {output_path} and {args.summary}")
+    if args.parquet:
+        parquet_path = output_path.with_suffix(".parquet")
+        write_trace_parquet(trace_rows, parquet_path)
+        print(f"OK: wrote {parquet_path}")
     return 0
 
 
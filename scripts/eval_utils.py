@@ -4,14 +4,32 @@ from __future__ import annotations
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
+
+# The scripts' JSON helpers take the orjson fast path when it is installed
+json_loads = orjson.loads if orjson is not None else json.loads
 
 
 def load_json(path: Path) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
     with path.open() as f:
         return json.load(f)
 
 
+def dump_json(obj: Any) -> bytes:
+    """Serialize ``obj`` as indented JSON bytes, via orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
 def load_env(path: str = ".env") -> None:
     env_path = Path(path)
     if not env_path.exists():
@@ -42,3 +60,67 @@ def extract_json(text: str) -> Dict[str, Any]:
     if start == -1 or end == -1 or end <= start:
         raise ValueError("no json found")
     return json.loads(text[start : end + 1])
+
+
+# Numeric per-episode fields that scripts/summarize.py reduces over. Traces can
+# additionally be written to Parquet with just these columns so summaries do
+# not have to re-parse full JSONL episodes.
+TRACE_SUMMARY_COLUMNS = (
+    ("model", "string"),
+    ("seed_path", "string"),
+    ("reward", "float64"),
+    ("step_count", "int32"),
+    ("submitted_report", "bool"),
+    ("evidence_seen_count", "int32"),
+    ("evidence_content_count", "int32"),
+    ("containment_attempted", "bool"),
+    ("containment_false_positive_total", "int32"),
+    ("containment_correct_total", "int32"),
+    ("evidence_gated_action_rate", "float64"),
+    ("time_to_first_containment", "float64"),
+    ("injection_violated", "bool"),
+    ("inj_tier1_violations", "int32"),
+    ("inj_tier2_violations", "int32"),
+    ("inj_tier3_violations", "int32"),
+)
+
+
+def trace_summary_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a JSONL trace row to the TRACE_SUMMARY_COLUMNS layout."""
+    diagnostics = row.get("diagnostics") or {}
+    injection = (row.get("details") or {}).get("injection") or {}
+    return {
+        "model": row.get("model", "unknown"),
+        "seed_path": row.get("seed_path", ""),
+        "reward": row.get("reward", 0.0),
+        "step_count": row.get("step_count", 0),
+        "submitted_report": bool(row.get("submitted_report", False)),
+        "evidence_seen_count": diagnostics.get("evidence_seen_count", 0),
+        "evidence_content_count": diagnostics.get("evidence_content_count", 0),
+        "containment_attempted": bool(diagnostics.get("containment_attempted", False)),
+        "containment_false_positive_total": row.get("containment_false_positive_total", 0),
+        "containment_correct_total": row.get("containment_correct_total", 0),
+        "evidence_gated_action_rate": row.get("evidence_gated_action_rate", 0.0),
+        "time_to_first_containment": row.get("time_to_first_containment"),
+        "injection_violated": bool(injection.get("violations")),
+        "inj_tier1_violations": row.get("inj_tier1_violations", 0),
+        "inj_tier2_violations": row.get("inj_tier2_violations", 0),
+        "inj_tier3_violations": row.get("inj_tier3_violations", 0),
+    }
+
+
+def import_pyarrow() -> Tuple[Any, Any]:
+    """Return (pyarrow, pyarrow.parquet), exiting with a hint if not installed."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise SystemExit("Parquet traces require pyarrow. Install with: pip install pyarrow") from exc
+    return pa, pq
+
+
+def write_trace_parquet(records: List[Dict[str, Any]], path: Path) -> None:
+    """Write trace_summary_record() outputs as a Parquet table."""
+    pa, pq = import_pyarrow()
+    schema = pa.schema([(name, pa.type_for_alias(kind)) for name, kind in TRACE_SUMMARY_COLUMNS])
+    pq.write_table(pa.Table.from_pylist(records, schema=schema), path)
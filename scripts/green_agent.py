@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import argparse
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from server.models import AgentAction
 
@@ -22,6 +22,11 @@ def _best_effort_value(parsed: Dict[str, str], *keys: str) -> Optional[str]:
     return None
 
 
+def _fetch_alert(env: OpenSecEnv, alert_id: str) -> Tuple[Any, Dict[str, str]]:
+    result = env.step(AgentAction(action_type="fetch_alert", params={"alert_id": alert_id}))
+    return result, result.observation.last_action_result.data.get("parsed", {})
+
+
 def run_green_agent(base_url: str, max_steps: int = 15) -> None:
     with OpenSecEnv(base_url=base_url) as env:
         result = env.reset()
@@ -29,38 +34,29 @@ def run_green_agent(base_url: str, max_steps: int = 15) -> None:
 
         for _ in range(max_steps):
             obs = result.observation
-
-            if obs.new_alerts:
-                alert_id = obs.new_alerts[0]
-                result = env.step(
-                    AgentAction(action_type="fetch_alert", params={"alert_id": alert_id})
+            alert_id = obs.new_alerts[0] if obs.new_alerts else None
+
+            if alert_id is None:
+                # Fallback: query for any alert id, then fetch
+                sql = (
+                    "SELECT alert_id FROM alerts "
+                    f"WHERE scenario_id = '{obs.scenario_id}' "
+                    "ORDER BY step DESC LIMIT 1"
                 )
-                parsed = result.observation.last_action_result.data.get("parsed", {})
+                result = env.step(AgentAction(action_type="query_logs", params={"sql": sql}))
+                rows = result.observation.last_action_result.data.get("rows", [])
+                alert_id = rows[0].get("alert_id") if rows else None
+
+            if alert_id:
+                result, parsed = _fetch_alert(env, alert_id)
                 break
 
-            # Fallback: query for any alert id, then fetch
-            sql = (
-                "SELECT alert_id FROM alerts "
-                f"WHERE scenario_id = '{obs.scenario_id}' "
-                "ORDER BY step DESC LIMIT 1"
-            )
-            result = env.step(AgentAction(action_type="query_logs", params={"sql": sql}))
-            rows = result.observation.last_action_result.data.get("rows", [])
-            if rows:
-                alert_id = rows[0].get("alert_id")
-                if alert_id:
-                    result = env.step(
-                        AgentAction(
-                            action_type="fetch_alert", params={"alert_id": alert_id}
-                        )
-                    )
-                    parsed = result.observation.last_action_result.data.get("parsed", {})
-                    break
-
-        attacker_domain = _best_effort_value(parsed, "dst_domain", "domain")
-        patient_zero_host = _best_effort_value(parsed, "src_host", "host")
-        compromised_user = _best_effort_value(parsed, "compromised_user", "user")
-        data_target = _best_effort_value(parsed, "data_target", "target")
+        attacker_domain = patient_zero_host = compromised_user = data_target = None
+        if parsed:
+            attacker_domain = _best_effort_value(parsed, "dst_domain", "domain")
+            patient_zero_host = _best_effort_value(parsed, "src_host", "host")
+            compromised_user = _best_effort_value(parsed, "compromised_user", "user")
+            data_target = _best_effort_value(parsed, "data_target", "target")
 
         if patient_zero_host:
             env.step(
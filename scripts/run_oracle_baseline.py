@@ -2,20 +2,15 @@
 from __future__ import annotations
 
 import argparse
-import json
 import os
 from pathlib import Path
 from typing import Any, Dict, List
 
+from eval_utils import dump_json, load_json
 from server.environment import OpenSecEnvironment
 from server.models import AgentAction
 
 
-def _load_json(path: Path) -> Dict[str, Any]:
-    with path.open() as f:
-        return json.load(f)
-
-
 def _infer_from_seed(seed: Dict[str, Any]) -> Dict[str, Any]:
     # Deterministic baseline based on seed contents (no LLM, no heuristics)
     report = {
@@ -33,15 +28,18 @@ def _infer_from_seed(seed: Dict[str, Any]) -> Dict[str, Any]:
     return report
 
 
-def run_baseline(seed_path: Path, max_steps: int) -> Dict[str, Any]:
+def run_baseline(seed_path: Path, max_steps: int, audit: bool = False) -> Dict[str, Any]:
     os.environ.setdefault("OPENSEC_DISABLE_ENV_LOAD", "1")
 
-    seed = _load_json(seed_path)
+    seed = load_json(seed_path)
     env = OpenSecEnvironment(seed_path=str(seed_path))
     env.reset()
 
-    # Minimal investigation: run a safe log query for audit trace
-    env.step(AgentAction(action_type="query_logs", params={"sql": "SELECT 1"}))
+    # Optional minimal investigation: a safe log query that only exists to
+    # leave an audit trace. Scoring is execution-based on the containment
+    # steps below, so it is skipped unless requested.
+    if audit:
+        env.step(AgentAction(action_type="query_logs", params={"sql": "SELECT 1"}))
 
     # Execute containment actions (required for execution-based scoring)
     env.step(AgentAction(action_type="isolate_host", params={"host_id": seed["patient_zero_host"]}))
@@ -65,13 +63,19 @@ def main() -> int:
     parser.add_argument("--seed", default="data/seeds/sample_seed.json")
     parser.add_argument("--max-steps", type=int, default=5)
     parser.add_argument("--output", default="outputs/baseline_result.json")
+    parser.add_argument(
+        "--audit",
+        action="store_true",
+        help="Issue a SELECT 1 query_logs step before containment for the audit trace",
+    )
     args = parser.parse_args()
 
-    result = run_baseline(Path(args.seed), args.max_steps)
+    result = run_baseline(Path(args.seed), args.max_steps, audit=args.audit)
     Path(args.output).parent.mkdir(parents=True, exist_ok=True)
-    Path(args.output).write_text(json.dumps(result, indent=2))
+    payload = dump_json(result)
+    Path(args.output).write_bytes(payload)
 
-    print(json.dumps(result, indent=2))
+    print(payload.decode("utf-8"))
     return 0
 
 
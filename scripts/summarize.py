@@ -4,193 +4,413 @@ from __future__ import annotations
 import argparse
 import json
 import math
+import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TypeVar
 
 from oracle.thresholds import classify_capability_level, DefensiveCapabilityLevel
+from eval_utils import dump_json, import_pyarrow, json_loads
+
+# Difficulty order for tier tables; other keys sort with "unknown" last
+_TIER_ORDER = ("trivial", "easy", "standard", "unknown")
+
+# Shared read-only default for missing nested trace sections, so rows without
+# diagnostics/details do not allocate a fresh dict per lookup.
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
 
 
 def _load_jsonl(path: Path) -> List[Dict[str, Any]]:
     if not path.exists():
         return []
     rows = []
-    for line in path.read_text().splitlines():
-        if not line.strip():
-            continue
-        try:
-            rows.append(json.loads(line))
-        except json.JSONDecodeError:
-            continue
+    # Iterate the file lazily instead of materializing the whole text and a
+    # list of its lines; both decoders accept the raw bytes directly.
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError.
+    with path.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                rows.append(json_loads(line))
+            except json.JSONDecodeError:
+                continue
     return rows
 
 
-def _load_manifest(manifest_path: Path) -> Dict[str, Dict[str, str]]:
-    """Load manifest and create lookup by seed_path."""
+def _load_parquet(path: Path) -> List[Dict[str, Any]]:
+    """Load a trace Parquet file written by eval.py --parquet.
+
+    Columns are flat (see eval_utils.TRACE_SUMMARY_COLUMNS); rows are rebuilt
+    in the JSONL trace shape so both formats share one metrics path.
+    """
+    _, pq = import_pyarrow()
+    rows = []
+    for rec in pq.read_table(path).to_pylist():
+        rec["diagnostics"] = {
+            "containment_attempted": rec.pop("containment_attempted", False),
+            "evidence_seen_count": rec.pop("evidence_seen_count", 0),
+            "evidence_content_count": rec.pop("evidence_content_count", 0),
+        }
+        rec["details"] = {"injection": {"violations": rec.pop("injection_violated", False)}}
+        rows.append(rec)
+    return rows
+
+
+def _load_traces(path: Path) -> List[Dict[str, Any]]:
+    if path.suffix == ".parquet":
+        return _load_parquet(path) if path.exists() else []
+    return _load_jsonl(path)
+
+
+_T = TypeVar("_T")
+
+# Below this many files the pool start-up and result pickling cost more than
+# reducing the files inline.
+_PARALLEL_MIN_FILES = 4
+
+
+def _map_paths(func: Callable[[Path], _T], paths: List[Path]) -> List[_T]:
+    """Apply ``func`` to each trace file, fanning out across processes.
+
+    Files are independent and decoding is CPU-bound, so multi-file runs are
+    spread over a process pool. ``func`` should return reduced accumulators
+    rather than rows, so little has to be pickled back. Results keep the order
+    of ``paths``.
+    """
+    if len(paths) < _PARALLEL_MIN_FILES:
+        return [func(path) for path in paths]
+    with ProcessPoolExecutor() as ex:
+        return list(ex.map(func, paths))
+
+
+def _tier_from_name(name: str) -> str:
+    """Tier named in a trace file name; earlier tiers win if several appear."""
+    for tier in ("trivial", "easy", "standard"):
+        if tier in name:
+            return tier
+    return "unknown"
+
+
+def _ordered_keys(groups: Mapping[str, Any], stratify_by: str) -> List[str]:
+    """Keys of ``groups`` in print order for a ``stratify_by`` table."""
+    if stratify_by == "tier":
+        keys = [key for key in _TIER_ORDER if key in groups]
+        keys.extend(sorted(key for key in groups if key not in _TIER_ORDER))
+        return keys
+    return sorted(groups, key=lambda key: (key == "unknown", key))
+
+
+def _discover_baseline_outputs(outputs_dir: Path) -> List[Path]:
+    """List outputs/llm_baselines*.jsonl without building a Path per entry."""
+    if not outputs_dir.is_dir():
+        return []
+    with os.scandir(outputs_dir) as it:
+        return sorted(
+            Path(entry.path)
+            for entry in it
+            if entry.name.startswith("llm_baselines")
+            and entry.name.endswith(".jsonl")
+            and entry.is_file()
+        )
+
+
+# Manifest fields kept per seed, in the order stored in _load_manifest tuples
+_MANIFEST_FIELDS = ("tier", "taxonomy_family", "taxonomy_id")
+_DEFAULT_META = ("unknown", "unknown", "unknown")
+
+
+@lru_cache(maxsize=4)
+def _load_manifest(manifest_path: Path) -> Dict[str, Tuple[str, str, str]]:
+    """Load manifest and create lookup by seed_path.
+
+    Values are (tier, taxonomy_family, taxonomy_id) tuples; see
+    _MANIFEST_FIELDS. Cached per path, so callers must not mutate the result.
+    """
     if not manifest_path.exists():
         return {}
-    manifest = json.loads(manifest_path.read_text())
+    # Parse straight from bytes and keep only the three fields we stratify on;
+    # the full manifest object is dropped as soon as the lookup is built.
+    manifest = json_loads(manifest_path.read_bytes())
     lookup = {}
     for split in ("train", "eval"):
         for entry in manifest.get(split, []):
-            lookup[entry["seed_path"]] = {
-                "tier": entry.get("tier", "unknown"),
-                "taxonomy_family": entry.get("taxonomy_family", "unknown"),
-                "taxonomy_id": entry.get("taxonomy_id", "unknown"),
-            }
+            lookup[entry["seed_path"]] = (
+                entry.get("tier", "unknown"),
+                entry.get("taxonomy_family", "unknown"),
+                entry.get("taxonomy_id", "unknown"),
+            )
     return lookup
 
 
-def _mean_std(values: List[float]) -> Tuple[float, float]:
-    if not values:
-        return 0.0, 0.0
-    mean = sum(values) / len(values)
-    if len(values) < 2:
-        return mean, 0.0
-    var = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
-    return mean, math.sqrt(var)
-
+@dataclass(slots=True)
+class _Moments:
+    """Count, mean and sum of squared deviations (M2) of a stream of values.
 
-def _compute_group_metrics(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Compute all per-group metrics from a list of trace rows.
+    Values are added with Welford's update and partial results combine with
+    Chan et al.'s pairwise formula, so neither step subtracts two large,
+    nearly equal sums: a constant stream keeps M2 at exactly 0.0.
+    """
 
-    Single source of truth for metric computation. Used by summarize(),
-    summarize_stratified(), and summarize_thresholds().
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other: _Moments) -> None:
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.mean, self.m2 = other.n, other.mean, other.m2
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+
+    def mean_std(self) -> Tuple[float, float]:
+        """Mean and sample std; (0.0, 0.0) when empty."""
+        if self.n < 2:
+            return self.mean, 0.0
+        return self.mean, math.sqrt(self.m2 / (self.n - 1))
+
+
+@dataclass(slots=True)
+class GroupAccumulator:
+    """Running totals for one group of trace rows.
+
+    Rows are folded in with update(); accumulators built from different files
+    combine with merge(), so a group never needs its rows held in memory.
     """
-    n = len(rows)
-    if n == 0:
-        return {}
 
-    rewards = [r.get("reward", 0.0) for r in rows]
-    reward_mean, reward_std = _mean_std(rewards)
-
-    steps = [r.get("step_count", 0) for r in rows]
-    step_mean, step_std = _mean_std([float(s) for s in steps])
-
-    diag = [r.get("diagnostics", {}) for r in rows]
-    containment = [d.get("containment_attempted", False) for d in diag]
-    fp_counts = [r.get("containment_false_positive_total", 0) for r in rows]
-
-    submitted = [r.get("submitted_report", False) for r in rows]
-    evidence_seen = [d.get("evidence_seen_count", 0) for d in diag]
-    evidence_content = [d.get("evidence_content_count", 0) for d in diag]
-
-    # Injection violations from details
-    inj_violations = 0
-    for r in rows:
-        details = r.get("details", {})
-        inj = details.get("injection", {})
-        if inj.get("violations"):
-            inj_violations += 1
-
-    # EGAR
-    egar_values = [r.get("evidence_gated_action_rate", 0.0) for r in rows]
-    egar_mean, egar_std = _mean_std(egar_values)
-
-    # TTFC (time to first containment) -- only episodes with containment
-    ttfc_values = [
-        float(r["time_to_first_containment"])
-        for r in rows
-        if r.get("time_to_first_containment") is not None
-    ]
-    ttfc_mean, ttfc_std = _mean_std(ttfc_values)
-
-    # Blast radius: fp / max(1, correct) per episode
-    blast_values = []
-    for r in rows:
-        fp = r.get("containment_false_positive_total", 0)
-        correct = r.get("containment_correct_total", 0)
+    n: int = 0
+    reward: _Moments = field(default_factory=_Moments)
+    reward_min: float = math.inf
+    reward_max: float = -math.inf
+    step: _Moments = field(default_factory=_Moments)
+    step_min: float = math.inf
+    step_max: float = -math.inf
+    cont_n: int = 0
+    fp_n: int = 0
+    submitted_n: int = 0
+    inj_violations: int = 0
+    evidence_seen_sum: int = 0
+    evidence_content_sum: int = 0
+    egar: _Moments = field(default_factory=_Moments)
+    # Only episodes with a containment / a containment outcome contribute
+    ttfc: _Moments = field(default_factory=_Moments)
+    blast: _Moments = field(default_factory=_Moments)
+    inj_t1: int = 0
+    inj_t2: int = 0
+    inj_t3: int = 0
+
+    def update(self, r: Mapping[str, Any]) -> None:
+        get = r.get
+        self.n += 1
+
+        reward = get("reward", 0.0)
+        self.reward.add(reward)
+        if reward < self.reward_min:
+            self.reward_min = reward
+        if reward > self.reward_max:
+            self.reward_max = reward
+
+        step = get("step_count", 0)
+        self.step.add(step)
+        if step < self.step_min:
+            self.step_min = step
+        if step > self.step_max:
+            self.step_max = step
+
+        d = get("diagnostics") or _EMPTY
+        self.cont_n += bool(d.get("containment_attempted"))
+        self.evidence_seen_sum += d.get("evidence_seen_count", 0)
+        self.evidence_content_sum += d.get("evidence_content_count", 0)
+        self.submitted_n += bool(get("submitted_report"))
+
+        details = get("details") or _EMPTY
+        self.inj_violations += bool(details.get("injection", _EMPTY).get("violations"))
+
+        egar = get("evidence_gated_action_rate", 0.0)
+        self.egar.add(egar)
+
+        # TTFC (time to first containment) -- only episodes with containment
+        ttfc = get("time_to_first_containment")
+        if ttfc is not None:
+            self.ttfc.add(float(ttfc))
+
+        # Blast radius: fp / max(1, correct) per episode
+        fp = get("containment_false_positive_total", 0)
+        correct = get("containment_correct_total", 0)
+        if fp > 0:
+            self.fp_n += 1
         if fp > 0 or correct > 0:
-            blast_values.append(fp / max(1, correct))
-    blast_mean, blast_std = _mean_std(blast_values)
-
-    # Per-tier injection rates
-    inj_tier1 = sum(1 for r in rows if r.get("inj_tier1_violations", 0) > 0)
-    inj_tier2 = sum(1 for r in rows if r.get("inj_tier2_violations", 0) > 0)
-    inj_tier3 = sum(1 for r in rows if r.get("inj_tier3_violations", 0) > 0)
-
-    # FP rate consistency (binary per episode)
-    fp_binary = [1.0 if fp > 0 else 0.0 for fp in fp_counts]
-    _, fp_rate_std = _mean_std(fp_binary)
-
-    fp_rate = sum(1 for fp in fp_counts if fp > 0) / n
-
-    return {
-        "episodes": n,
-        "reward": reward_mean,
-        "reward_std": reward_std,
-        "reward_min": min(rewards),
-        "reward_max": max(rewards),
-        "step_mean": step_mean,
-        "step_std": step_std,
-        "step_min": min(steps),
-        "step_max": max(steps),
-        "report_submitted_rate": sum(1 for s in submitted if s) / n,
-        "evidence_seen_mean": sum(evidence_seen) / n,
-        "evidence_content_mean": sum(evidence_content) / n,
-        "cont_rate": sum(1 for c in containment if c) / n,
-        "fp_rate": fp_rate,
-        "inj_rate": inj_violations / n,
-        "egar_mean": egar_mean,
-        "egar_std": egar_std,
-        "ttfc_mean": ttfc_mean if ttfc_values else None,
-        "ttfc_std": ttfc_std if ttfc_values else None,
-        "blast_radius_mean": blast_mean if blast_values else None,
-        "blast_radius_std": blast_std if blast_values else None,
-        "inj_tier1_rate": inj_tier1 / n,
-        "inj_tier2_rate": inj_tier2 / n,
-        "inj_tier3_rate": inj_tier3 / n,
-        "fp_rate_std": fp_rate_std,
-    }
+            self.blast.add(fp / (correct if correct > 0 else 1))
+
+        # Per-tier injection rates
+        if get("inj_tier1_violations", 0) > 0:
+            self.inj_t1 += 1
+        if get("inj_tier2_violations", 0) > 0:
+            self.inj_t2 += 1
+        if get("inj_tier3_violations", 0) > 0:
+            self.inj_t3 += 1
+
+    def merge(self, other: GroupAccumulator) -> GroupAccumulator:
+        # Counts add, extrema combine, moments use the pairwise merge.
+        for f in fields(self):
+            name = f.name
+            value = getattr(self, name)
+            if isinstance(value, _Moments):
+                value.merge(getattr(other, name))
+            elif name.endswith("_min"):
+                setattr(self, name, min(getattr(self, name), getattr(other, name)))
+            elif name.endswith("_max"):
+                setattr(self, name, max(getattr(self, name), getattr(other, name)))
+            else:
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def metrics(self) -> Dict[str, Any]:
+        n = self.n
+        if n == 0:
+            return {}
+
+        reward_mean, reward_std = self.reward.mean_std()
+        step_mean, step_std = self.step.mean_std()
+        egar_mean, egar_std = self.egar.mean_std()
+        ttfc_mean, ttfc_std = self.ttfc.mean_std()
+        blast_mean, blast_std = self.blast.mean_std()
+
+        # FP rate consistency: sample std of the per-episode FP indicator
+        fp_rate = self.fp_n / n
+        fp_rate_std = math.sqrt(n * fp_rate * (1.0 - fp_rate) / (n - 1)) if n > 1 else 0.0
+
+        return {
+            "episodes": n,
+            "reward": reward_mean,
+            "reward_std": reward_std,
+            "reward_min": self.reward_min,
+            "reward_max": self.reward_max,
+            "step_mean": step_mean,
+            "step_std": step_std,
+            "step_min": self.step_min,
+            "step_max": self.step_max,
+            "report_submitted_rate": self.submitted_n / n,
+            "evidence_seen_mean": self.evidence_seen_sum / n,
+            "evidence_content_mean": self.evidence_content_sum / n,
+            "cont_rate": self.cont_n / n,
+            "fp_rate": fp_rate,
+            "inj_rate": self.inj_violations / n,
+            "egar_mean": egar_mean,
+            "egar_std": egar_std,
+            "ttfc_mean": ttfc_mean if self.ttfc.n else None,
+            "ttfc_std": ttfc_std if self.ttfc.n else None,
+            "blast_radius_mean": blast_mean if self.blast.n else None,
+            "blast_radius_std": blast_std if self.blast.n else None,
+            "inj_tier1_rate": self.inj_t1 / n,
+            "inj_tier2_rate": self.inj_t2 / n,
+            "inj_tier3_rate": self.inj_t3 / n,
+            "fp_rate_std": fp_rate_std,
+        }
+
+
+def _reduce_file(path: Path) -> Optional[Tuple[str, GroupAccumulator]]:
+    """Reduce one trace file to a single accumulator for summarize().
+
+    The model is taken from the file's first row; returns None for an empty
+    file.
+    """
+    model = None
+    acc = GroupAccumulator()
+    for row in _load_traces(path):
+        if model is None:
+            model = row.get("model", "unknown")
+        acc.update(row)
+    if model is None:
+        return None
+    return model, acc
+
+
+def _reduce_by_model(path: Path) -> Dict[str, GroupAccumulator]:
+    """Reduce one trace file to per-model accumulators."""
+    by_model: Dict[str, GroupAccumulator] = defaultdict(GroupAccumulator)
+    for row in _load_traces(path):
+        by_model[row.get("model", "unknown")].update(row)
+    return dict(by_model)
+
+
+def _reduce_by_model_and_key(
+    path: Path,
+    manifest_lookup: Dict[str, Tuple[str, str, str]],
+    stratify_by: str,
+) -> Dict[str, Dict[str, GroupAccumulator]]:
+    """Reduce one trace file to accumulators keyed by model and manifest field."""
+    field_idx = _MANIFEST_FIELDS.index(stratify_by)
+    groups: Dict[str, Dict[str, GroupAccumulator]] = {}
+    for row in _load_traces(path):
+        strat_key = manifest_lookup.get(row.get("seed_path", ""), _DEFAULT_META)[field_idx]
+        by_key = groups.setdefault(row.get("model", "unknown"), {})
+        acc = by_key.get(strat_key)
+        if acc is None:
+            acc = by_key[strat_key] = GroupAccumulator()
+        acc.update(row)
+    return groups
+
+
+# (summary key, GroupAccumulator.metrics() key), in output order. The
+# stratified table also reads inj_rate, which the JSON summary leaves out.
+_SUMMARY_FIELDS = (
+    ("runs", "episodes"),
+    ("reward_mean", "reward"),
+    ("reward_std", "reward_std"),
+    ("reward_min", "reward_min"),
+    ("reward_max", "reward_max"),
+    ("step_mean", "step_mean"),
+    ("step_std", "step_std"),
+    ("step_min", "step_min"),
+    ("step_max", "step_max"),
+    ("report_submitted_rate", "report_submitted_rate"),
+    ("evidence_seen_mean", "evidence_seen_mean"),
+    ("evidence_content_mean", "evidence_content_mean"),
+    ("containment_attempted_rate", "cont_rate"),
+    ("egar_mean", "egar_mean"),
+    ("egar_std", "egar_std"),
+    ("ttfc_mean", "ttfc_mean"),
+    ("ttfc_std", "ttfc_std"),
+    ("blast_radius_mean", "blast_radius_mean"),
+    ("blast_radius_std", "blast_radius_std"),
+    ("fp_rate", "fp_rate"),
+    ("fp_rate_std", "fp_rate_std"),
+    ("inj_tier1_rate", "inj_tier1_rate"),
+    ("inj_tier2_rate", "inj_tier2_rate"),
+    ("inj_tier3_rate", "inj_tier3_rate"),
+)
 
 
 def summarize(paths: List[Path]) -> Dict[str, Any]:
     summary: Dict[str, Any] = {}
-    for path in paths:
-        rows = _load_jsonl(path)
-        if not rows:
+    for path, reduced in zip(paths, _map_paths(_reduce_file, paths)):
+        if reduced is None:
             continue
-        model = rows[0].get("model", "unknown")
-        tier = "unknown"
-        if "trivial" in path.name:
-            tier = "trivial"
-        elif "easy" in path.name:
-            tier = "easy"
-        elif "standard" in path.name:
-            tier = "standard"
-
-        g = _compute_group_metrics(rows)
-
-        key = f"{model}|{tier}"
-        summary[key] = {
-            "model": model,
-            "tier": tier,
-            "runs": g["episodes"],
-            "reward_mean": g["reward"],
-            "reward_std": g["reward_std"],
-            "reward_min": g["reward_min"],
-            "reward_max": g["reward_max"],
-            "step_mean": g["step_mean"],
-            "step_std": g["step_std"],
-            "step_min": g["step_min"],
-            "step_max": g["step_max"],
-            "report_submitted_rate": g["report_submitted_rate"],
-            "evidence_seen_mean": g["evidence_seen_mean"],
-            "evidence_content_mean": g["evidence_content_mean"],
-            "containment_attempted_rate": g["cont_rate"],
-            "egar_mean": g["egar_mean"],
-            "egar_std": g["egar_std"],
-            "ttfc_mean": g["ttfc_mean"],
-            "ttfc_std": g["ttfc_std"],
-            "blast_radius_mean": g["blast_radius_mean"],
-            "blast_radius_std": g["blast_radius_std"],
-            "fp_rate": g["fp_rate"],
-            "fp_rate_std": g["fp_rate_std"],
-            "inj_tier1_rate": g["inj_tier1_rate"],
-            "inj_tier2_rate": g["inj_tier2_rate"],
-            "inj_tier3_rate": g["inj_tier3_rate"],
-            "source_file": str(path),
-        }
+        model, acc = reduced
+        tier = _tier_from_name(path.name)
+
+        metrics = acc.metrics()
+        g: Dict[str, Any] = {"model": model, "tier": tier}
+        for out_key, metric_key in _SUMMARY_FIELDS:
+            g[out_key] = metrics[metric_key]
+        g["source_file"] = str(path)
+        summary[f"{model}|{tier}"] = g
     return summary
 
 
@@ -202,40 +422,26 @@ def summarize_stratified(
     """Summarize traces grouped by stratification key."""
     manifest_lookup = _load_manifest(manifest_path)
 
-    # Load all traces and enrich with manifest data
-    all_rows: List[Dict[str, Any]] = []
-    for path in paths:
-        rows = _load_jsonl(path)
-        for row in rows:
-            seed_path = row.get("seed_path", "")
-            meta = manifest_lookup.get(seed_path, {})
-            row["_tier"] = meta.get("tier", "unknown")
-            row["_taxonomy_family"] = meta.get("taxonomy_family", "unknown")
-            row["_taxonomy_id"] = meta.get("taxonomy_id", "unknown")
-            all_rows.append(row)
-
-    if not all_rows:
+    # Each file is reduced to (model, strat key) accumulators as it streams,
+    # then the per-file groups are merged
+    reduce_file = partial(
+        _reduce_by_model_and_key, manifest_lookup=manifest_lookup, stratify_by=stratify_by
+    )
+    by_model: Dict[str, Dict[str, GroupAccumulator]] = defaultdict(
+        lambda: defaultdict(GroupAccumulator)
+    )
+    for file_groups in _map_paths(reduce_file, paths):
+        for model, by_key in file_groups.items():
+            for strat_key, acc in by_key.items():
+                by_model[model][strat_key].merge(acc)
+
+    if not by_model:
         print("No traces found")
         return
 
-    # Group by model, then by stratification key
-    by_model: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    for row in all_rows:
-        model = row.get("model", "unknown")
-        by_model[model].append(row)
-
-    # Map stratify_by to internal field
-    strat_field = f"_{stratify_by}"
-
-    for model, rows in sorted(by_model.items()):
+    for model, by_strat in sorted(by_model.items()):
         print(f"\nModel: {model}")
 
-        # Group by stratification key
-        by_strat: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        for row in rows:
-            key = row.get(strat_field, "unknown")
-            by_strat[key].append(row)
-
         # Print table header
         print(
             f"  {stratify_by:15} | {'ep':>3} | {'reward':>6} | {'fp_rate':>7} | "
@@ -244,9 +450,8 @@ def summarize_stratified(
         print(f"  {'-'*15}-|-----|--------|---------|-------|-------|-------|------|------|------")
 
         # Print rows
-        for strat_key in sorted(by_strat.keys()):
-            group_rows = by_strat[strat_key]
-            m = _compute_group_metrics(group_rows)
+        for strat_key in _ordered_keys(by_strat, stratify_by):
+            m = by_strat[strat_key].metrics()
             blast = m.get("blast_radius_mean")
             blast_str = f"{blast:>5.2f}" if blast is not None else "  n/a"
             print(
@@ -259,12 +464,11 @@ def summarize_stratified(
 
 def summarize_thresholds(paths: List[Path]) -> None:
     """Print threshold classification per model."""
-    # Load all traces grouped by model
-    by_model: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    for path in paths:
-        for row in _load_jsonl(path):
-            model = row.get("model", "unknown")
-            by_model[model].append(row)
+    # Reduce each file to per-model accumulators, then merge across files
+    by_model: Dict[str, GroupAccumulator] = defaultdict(GroupAccumulator)
+    for file_groups in _map_paths(_reduce_by_model, paths):
+        for model, acc in file_groups.items():
+            by_model[model].merge(acc)
 
     if not by_model:
         print("No traces found")
@@ -276,8 +480,7 @@ def summarize_thresholds(paths: List[Path]) -> None:
     print()
 
     for model in sorted(by_model.keys()):
-        rows = by_model[model]
-        m = _compute_group_metrics(rows)
+        m = by_model[model].metrics()
 
         # Build metrics dict for threshold classification
         threshold_metrics: Dict[str, float] = {}
@@ -328,7 +531,7 @@ def summarize_thresholds(paths: List[Path]) -> None:
 
 def main() -> int:
     parser = argparse.ArgumentParser()
-    parser.add_argument("files", nargs="*", help="JSONL files to summarize")
+    parser.add_argument("files", nargs="*", help="JSONL or Parquet trace files to summarize")
     parser.add_argument("--glob", default=None, help="Glob pattern (alternative to positional args)")
     parser.add_argument("--output", default="outputs/baseline_summary.json")
     parser.add_argument("--manifest", default="data/seeds/manifest.json", help="Seed manifest for metadata")
@@ -349,7 +552,7 @@ def main() -> int:
     elif args.glob:
         paths = sorted(Path(".").glob(args.glob))
     else:
-        paths = sorted(Path("outputs").glob("llm_baselines*.jsonl"))
+        paths = _discover_baseline_outputs(Path("outputs"))
 
     if args.thresholds:
         summarize_thresholds(paths)
@@ -362,7 +565,7 @@ def main() -> int:
     summary = summarize(paths)
     out_path = Path(args.output)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(summary, indent=2))
+    out_path.write_bytes(dump_json(summary))
     print(f"OK: wrote {out_path}")
     return 0
 
@@ -1,24 +1,32 @@
 #!/usr/bin/env python3
-import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from eval_utils import load_json
+
 try:
     import jsonschema
 except Exception:
     jsonschema = None
 
 
-def _load_json(path: Path):
-    with path.open() as f:
-        return json.load(f)
+def _compile(schema_path: Path):
+    """Check a schema once and build a reusable validator for it."""
+    schema = load_json(schema_path)
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
 
 
-def _validate(schema_path: Path, instance_path: Path) -> int:
-    schema = _load_json(schema_path)
-    instance = _load_json(instance_path)
-    jsonschema.validate(instance=instance, schema=schema)
-    print(f"OK: {instance_path}")
+def _validate(validator, instance_path: Path) -> int:
+    instance = load_json(instance_path)
+    # Same error selection as jsonschema.validate(), without re-checking the
+    # schema and rebuilding the validator per file
+    error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+    if error is not None:
+        raise error
     return 0
 
 
@@ -27,15 +35,21 @@ def main():
         print("jsonschema not installed; skipping schema validation")
         return 0
 
-    seed_schema = Path("schemas/seed_schema.json")
-    gt_schema = Path("schemas/ground_truth_schema.json")
+    seed_validator = _compile(Path("schemas/seed_schema.json"))
+    gt_validator = _compile(Path("schemas/ground_truth_schema.json"))
+
+    def validate_one(path: Path) -> int:
+        validator = gt_validator if "ground_truth" in path.name else seed_validator
+        return _validate(validator, path)
 
+    # Files are read and validated concurrently; results (and the first
+    # validation error) are reported in glob order
+    paths = list(Path("data/seeds").glob("*.json"))
     errors = 0
-    for seed_path in Path("data/seeds").glob("*.json"):
-        if "ground_truth" in seed_path.name:
-            errors += _validate(gt_schema, seed_path)
-        else:
-            errors += _validate(seed_schema, seed_path)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        for path, errs in zip(paths, ex.map(validate_one, paths)):
+            print(f"OK: {path}")
+            errors += errs
 
     return errors
 
@@ -1,20 +1,18 @@
 #!/usr/bin/env python3
-import json
 import sys
 from pathlib import Path
 
+from eval_utils import load_json
+
 LOG_TABLES = {"email_logs", "auth_logs", "netflow", "process_events", "alerts"}
+# Row id prefix per table, as emitted by sim.log_compiler ("<prefix>-<scenario>-<step>")
+ROW_ID_PREFIXES = {"alerts": "alert", "auth_logs": "auth", "netflow": "flow", "process_events": "proc"}
 
 
 def _err(msg):
     print(f"ERROR: {msg}")
 
 
-def _load_json(path):
-    with path.open() as f:
-        return json.load(f)
-
-
 def validate_seed(seed):
     errors = 0
 
@@ -82,14 +80,13 @@ def validate_seed(seed):
                     _err("timeline artifact log_template not in seed_artifacts.log_templates")
                     errors += 1
             elif art_type == "alert":
-                if art_id not in log_templates:
+                template = log_templates.get(art_id)
+                if template is None:
                     _err("timeline artifact alert not in seed_artifacts.log_templates")
                     errors += 1
-                else:
-                    table = log_templates[art_id]["table"]
-                    if table != "alerts":
-                        _err("timeline artifact alert must reference log_template with table=alerts")
-                        errors += 1
+                elif template["table"] != "alerts":
+                    _err("timeline artifact alert must reference log_template with table=alerts")
+                    errors += 1
             variant_action = art.get("variant_action_type")
             if variant_action and variant_action not in {
                 "lateral_move",
@@ -101,6 +98,8 @@ def validate_seed(seed):
                 errors += 1
 
     # prompt injection mapping
+    scenario_id = seed["scenario_id"]
+    row_id_prefix = {table: f"{prefix}-{scenario_id}" for table, prefix in ROW_ID_PREFIXES.items()}
     injections = seed["prompt_injection_payloads"]
     injection_ids = {p["injection_id"] for p in injections}
     if len(injection_ids) != len(injections):
@@ -110,6 +109,14 @@ def validate_seed(seed):
     template_by_injection = {
         t.get("injection_id"): t for t in seed["seed_artifacts"]["log_templates"] if t.get("injection_id")
     }
+    email_injection_ids = {
+        e.get("injection_id") for e in seed["seed_artifacts"]["emails"] if e.get("injection_id")
+    }
+    alert_injection_ids = {
+        t.get("injection_id")
+        for t in seed["seed_artifacts"]["log_templates"]
+        if t.get("injection_id") and t.get("table") == "alerts"
+    }
     timeline_steps = {}
     for item in artifact_events:
         for art in item["artifacts"]:
@@ -119,14 +126,11 @@ def validate_seed(seed):
     for p in injections:
         inj_id = p["injection_id"]
         if p["surface"] == "email":
-            if not any(e.get("injection_id") == inj_id for e in seed["seed_artifacts"]["emails"]):
+            if inj_id not in email_injection_ids:
                 _err("email injection_id not referenced by any seed_artifacts.emails")
                 errors += 1
         elif p["surface"] == "alert":
-            if not any(
-                t.get("injection_id") == inj_id and t.get("table") == "alerts"
-                for t in seed["seed_artifacts"]["log_templates"]
-            ):
+            if inj_id not in alert_injection_ids:
                 _err("alert injection_id not referenced by any alerts log_template")
                 errors += 1
             else:
@@ -134,7 +138,7 @@ def validate_seed(seed):
                 if template:
                     step = timeline_steps.get(template.get("template_id"))
                     if step is not None:
-                        expected = f"alert-{seed['scenario_id']}-{step}"
+                        expected = f"{row_id_prefix['alerts']}-{step}"
                         evidence_ids = set(p.get("evidence_ids", []))
                         if expected not in evidence_ids:
                             _err("alert injection evidence_ids missing expected alert id")
@@ -155,12 +159,8 @@ def validate_seed(seed):
                     errors += 1
                 else:
                     expected = None
-                    if table == "auth_logs":
-                        expected = f"auth-{seed['scenario_id']}-{step}"
-                    elif table == "netflow":
-                        expected = f"flow-{seed['scenario_id']}-{step}"
-                    elif table == "process_events":
-                        expected = f"proc-{seed['scenario_id']}-{step}"
+                    if table in ("auth_logs", "netflow", "process_events"):
+                        expected = f"{row_id_prefix[table]}-{step}"
                     evidence_ids = set(p.get("evidence_ids", []))
                     if expected and expected not in evidence_ids:
                         _err("log injection evidence_ids missing expected row id")
@@ -183,7 +183,7 @@ def main(argv):
 
     total_errors = 0
     for path in candidates:
-        seed = _load_json(path)
+        seed = load_json(path)
         errs = validate_seed(seed)
         if errs == 0:
             print(f"OK: {path}")
@@ -2,21 +2,64 @@
 from __future__ import annotations
 
 import argparse
-import json
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
+from typing import Optional, Tuple
 
 import sys
 from pathlib import Path as _Path
 
 sys.path.append(str(_Path(__file__).resolve().parents[1]))
 
+from eval_utils import load_json
 from scripts.validate_seed import validate_seed
 from sim.log_compiler import compile_seed
 
-
-def _load_json(path: Path):
-    with path.open() as f:
-        return json.load(f)
+# (temp DB written by a worker, final DB path it is moved to)
+_CompiledDB = Tuple[Path, Path]
+
+
+def _check_seed(seed_path: Path, db_dir: Path, tmp_dir: Path) -> Tuple[int, Optional[_CompiledDB]]:
+    seed = load_json(seed_path)
+    errs = validate_seed(seed)
+    if errs:
+        return errs, None
+
+    # Compile into a private file: seeds sharing a scenario_id would
+    # otherwise write the same DB from two processes at once
+    fd, tmp_name = tempfile.mkstemp(prefix=f"{seed['scenario_id']}-", suffix=".db.tmp", dir=tmp_dir)
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        compile_seed(seed_path, tmp_path)
+    except Exception as exc:
+        tmp_path.unlink(missing_ok=True)
+        print(f"ERROR: log compile failed for {seed_path}: {exc}")
+        return 1, None
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return 0, (tmp_path, db_dir / f"{seed['scenario_id']}.db")
+
+
+def _validate_and_compile(
+    seed_path: Path, db_dir: Path, tmp_dir: Path
+) -> Tuple[int, str, Optional[_CompiledDB]]:
+    """Validate one seed and compile its log DB in a worker process.
+
+    Returns the error count, the messages the seed produced, and the compiled
+    DB to move into place. Output is captured so the parent can print it in
+    seed order.
+    """
+    out = io.StringIO()
+    with redirect_stdout(out):
+        errs, compiled = _check_seed(seed_path, db_dir, tmp_dir)
+    return errs, out.getvalue(), compiled
 
 
 def main() -> int:
@@ -26,28 +69,36 @@ def main() -> int:
     parser.add_argument("--db-dir", default="data/sqlite/validate")
     args = parser.parse_args()
 
-    manifest = _load_json(Path(args.manifest))
+    manifest = load_json(Path(args.manifest))
     splits = [args.split] if args.split != "all" else ["train", "eval"]
 
     db_dir = Path(args.db_dir)
     db_dir.mkdir(parents=True, exist_ok=True)
 
+    seed_paths = [Path(entry["seed_path"]) for split in splits for entry in manifest[split]]
+
+    # Seeds are validated and compiled independently, so spread them across
+    # processes. Results come back in seed order; printing and moving each DB
+    # into place here keeps the output and the surviving DB for a repeated
+    # scenario_id the same as a sequential run. Workers compile into a
+    # private directory; whatever was not moved out of it when the run ends,
+    # including DBs of results never collected after a failure, is removed.
     errors = 0
-    for split in splits:
-        for entry in manifest[split]:
-            seed_path = Path(entry["seed_path"])
-            seed = _load_json(seed_path)
-            errs = validate_seed(seed)
-            if errs:
+    tmp_dir = Path(tempfile.mkdtemp(prefix=".compile-", dir=db_dir))
+    try:
+        with ProcessPoolExecutor() as ex:
+            for errs, output, compiled in ex.map(
+                _validate_and_compile,
+                seed_paths,
+                [db_dir] * len(seed_paths),
+                [tmp_dir] * len(seed_paths),
+            ):
+                print(output, end="")
                 errors += errs
-                continue
-
-            db_path = db_dir / f"{seed['scenario_id']}.db"
-            try:
-                compile_seed(seed_path, db_path)
-            except Exception as exc:
-                print(f"ERROR: log compile failed for {seed_path}: {exc}")
-                errors += 1
+                if compiled is not None:
+                    os.replace(*compiled)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
     if errors > 0:
         print(f"Validation failed with {errors} error(s)")
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
+from typing import Tuple
 
 from fastapi import FastAPI
 
@@ -13,7 +15,9 @@ except ImportError:  # fallback for dev tooling
     openenv_create_app = None
 
 
-def _env_factory() -> OpenSecOpenEnv:
+@lru_cache(maxsize=1)
+def _settings() -> Tuple[str, str, int, bool]:
+    """Read the OPENSEC_* environment once per process."""
     seed_path = os.getenv("OPENSEC_SEED_PATH", "data/seeds/sample_seed.json")
     sqlite_dir = os.getenv("OPENSEC_SQLITE_DIR", "data/sqlite")
     max_steps = int(os.getenv("OPENSEC_MAX_STEPS", "15"))
@@ -22,6 +26,11 @@ def _env_factory() -> OpenSecOpenEnv:
         "true",
         "yes",
     )
+    return seed_path, sqlite_dir, max_steps, mask_injections
+
+
+def _env_factory() -> OpenSecOpenEnv:
+    seed_path, sqlite_dir, max_steps, mask_injections = _settings()
     return OpenSecOpenEnv(
         seed_path=seed_path,
         sqlite_dir=sqlite_dir,
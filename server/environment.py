@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import json
 import os
 import sqlite3
 import re
 import uuid
+from bisect import insort
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
 
 from sim.attacker_policy import (
     AttackerPolicyManager,
@@ -29,6 +36,22 @@ from oracle.verifier import detect_injection_violations
 
 from .models import ActionResult, AgentAction, ContainmentState, EpisodeState, Observation, StepResult
 
+# key=value pairs in alert messages, e.g. "dst_domain=evil.com user=u-001"
+_ALERT_KV_RE = re.compile(r"([a-zA-Z_]+)=([a-zA-Z0-9_.:@-]+)")
+
+# Fixed lookups run on every step/fetch. Reusing the same text on the episode
+# connection lets sqlite3's statement cache skip re-preparing them.
+_SQL_FETCH_ALERT = "SELECT * FROM alerts WHERE scenario_id = ? AND alert_id = ?"
+_SQL_FETCH_EMAIL = "SELECT * FROM email_logs WHERE scenario_id = ? AND email_id = ?"
+_SQL_EMAILS_FOR_STEP = "SELECT email_id FROM email_logs WHERE scenario_id = ? AND step = ?"
+_SQL_ALERTS_FOR_STEP = "SELECT alert_id FROM alerts WHERE scenario_id = ? AND step = ?"
+
+# Marks a ground truth file that was looked up and not found
+_MISSING = object()
+
+# Row columns that identify an evidence item returned by query_logs
+_EVIDENCE_ID_COLUMNS = ("email_id", "alert_id", "auth_id", "flow_id", "event_id")
+
 
 class OpenSecEnvironment:
     def __init__(
@@ -49,19 +72,39 @@ class OpenSecEnvironment:
         self.attacker_state = "phish_sent"
         self.attacker_context = AttackerContext()
         self.containment = ContainmentState()
+        self._reset_containment_sets()
         self.scenario: Optional[Dict[str, Any]] = None
         self.db_path: Optional[str] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._log_templates: Dict[str, Dict[str, Any]] = {}
+        self._timeline_by_step: Dict[int, List[Dict[str, Any]]] = {}
+        self._actions_by_state: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._attack_graph: Optional[Dict[str, Any]] = None
+        self._uses_graph = False
+        self._all_hosts: Tuple[str, ...] = ()
+        self._all_users: Tuple[str, ...] = ()
+        self._attacker_domains: Tuple[str, ...] = ()
         cache_path = os.getenv("OPENSEC_REPLAY_CACHE_PATH")
         if cache_path and resolve_replay_mode() != "off":
             init_cache_db(cache_path)
+            self._cache_path: Optional[str] = cache_path
             self.cache = ReplayCache(cache_path)
         else:
+            # Falls back to the episode DB once one exists (see _init_db)
+            self._cache_path = None
             self.cache = None
         self.policy_manager = AttackerPolicyManager(cache=self.cache)
         self.policy = resolve_attacker_policy()
-        self.ground_truth: Optional[Dict[str, Any]] = None
+        self.policy_model, self.policy_temperature = resolve_attacker_policy_config()
+        self._ground_truth_path: Optional[Path] = None
+        self._ground_truth_cache: Any = None
         self.seen_evidence_ids: Set[str] = set()
         self.content_evidence_ids: Set[str] = set()
+        # Sorted views of the two evidence sets, kept up to date on insert so
+        # observations do not re-sort the full history every step (pydantic
+        # copies them into each Observation)
+        self._seen_sorted: List[str] = []
+        self._content_sorted: List[str] = []
         self.injection_violations: List[str] = []
 
     def reset(self) -> StepResult:
@@ -70,8 +113,11 @@ class OpenSecEnvironment:
         self.attacker_state = "phish_sent"
         self.attacker_context = AttackerContext()
         self.containment = ContainmentState()
+        self._reset_containment_sets()
         self.seen_evidence_ids = set()
         self.content_evidence_ids = set()
+        self._seen_sorted = []
+        self._content_sorted = []
         self.injection_violations = []
         self._load_scenario()
         if self.scenario and self.scenario.get("attack_graph", {}).get("start_state"):
@@ -92,13 +138,13 @@ class OpenSecEnvironment:
             containment=self.containment,
             new_emails=new_emails,
             new_alerts=new_alerts,
-            evidence_seen_ids=sorted(self.seen_evidence_ids),
-            evidence_content_ids=sorted(self.content_evidence_ids),
+            evidence_seen_ids=self._seen_sorted,
+            evidence_content_ids=self._content_sorted,
             last_action_result=ActionResult(ok=True, message="reset", data={}),
             hint="Environment ready",
             done=False,
             reward=None,
-            metadata={"info": {}, "state": state.model_dump()},
+            metadata={"info": {}, "state": _state_dict(state)},
         )
 
         return StepResult(
@@ -113,29 +159,37 @@ class OpenSecEnvironment:
         if self.scenario is None or self.db_path is None:
             self._load_scenario()
             self._init_db()
+        elif self.cache is None:
+            # close() released the cache mid-episode
+            self._open_cache()
 
         result = self.apply_action(action)
+        # Dumped once and shared by the verifier and the attacker policy (both
+        # read it only). model_dump() rather than __dict__ keeps extra fields.
+        action_payload = action.model_dump()
+
+        # Empty for payload-free seeds and when mask_injections is set
+        payloads = self.scenario.get("prompt_injection_payloads")
+        if payloads:
+            violations = detect_injection_violations(
+                action_payload,
+                self.content_evidence_ids,
+                payloads,
+            )
+            if violations:
+                self.injection_violations.extend(violations)
 
-        violations = detect_injection_violations(
-            action.model_dump(),
-            self.content_evidence_ids,
-            self.scenario.get("prompt_injection_payloads", []),
-        )
-        if violations:
-            self.injection_violations.extend(violations)
-
-        model, temperature = resolve_attacker_policy_config()
         attacker_context_payload = self._attacker_policy_context()
         attacker_action = self.policy_manager.decide(
             scenario_id=self.scenario_id,
             step=self.step_count,
             attacker_state=self.attacker_state,
-            agent_action=action.model_dump(),
+            agent_action=action_payload,
             policy=self.policy,
             scenario=self.scenario,
             attacker_context=attacker_context_payload,
-            model=model,
-            temperature=temperature,
+            model=self.policy_model,
+            temperature=self.policy_temperature,
         )
 
         prior_state = self.attacker_state
@@ -144,18 +198,13 @@ class OpenSecEnvironment:
             patient_zero_host=self.scenario["patient_zero_host"],
             compromised_user=self.scenario["compromised_user"],
         )
-        containment = ContainmentActions(
-            isolated_hosts=self.containment.isolated_hosts,
-            blocked_domains=self.containment.blocked_domains,
-            reset_users=self.containment.reset_users,
-        )
         advance = advance_state(
             self.attacker_state,
-            containment,
+            self._containment_actions,
             ctx,
             attacker_action=attacker_action,
             attacker_context=self.attacker_context,
-            attack_graph=self.scenario.get("attack_graph"),
+            attack_graph=self._attack_graph,
         )
         self.attacker_state = advance.next_state
 
@@ -200,12 +249,12 @@ class OpenSecEnvironment:
             containment=self.containment,
             new_emails=new_emails,
             new_alerts=new_alerts,
-            evidence_seen_ids=sorted(self.seen_evidence_ids),
-            evidence_content_ids=sorted(self.content_evidence_ids),
+            evidence_seen_ids=self._seen_sorted,
+            evidence_content_ids=self._content_sorted,
             last_action_result=ActionResult(ok=True, message=action.action_type, data=result),
             done=done,
             reward=reward,
-            metadata={"info": info, "state": state.model_dump()},
+            metadata={"info": info, "state": _state_dict(state)},
         )
 
         return StepResult(
@@ -223,12 +272,10 @@ class OpenSecEnvironment:
         action_params = attacker_action.get("params", {})
         if not action_type:
             return
-        timeline = self.scenario["attack_plan"]["timeline"]
-        log_templates = {t["template_id"]: t for t in self.scenario["seed_artifacts"]["log_templates"]}
-        for item in timeline:
-            if item["step"] != step:
-                continue
-            for art in item["artifacts"]:
+        conn = self._db()
+        # All of a step's artifacts are written in one transaction
+        with conn:
+            for art in self._timeline_by_step.get(step, ()):
                 variant_action = art.get("variant_action_type")
                 if not variant_action:
                     continue
@@ -238,9 +285,9 @@ class OpenSecEnvironment:
                 if variant_params:
                     if any(action_params.get(k) != v for k, v in variant_params.items()):
                         continue
-                with sqlite3.connect(self.db_path) as conn:
-                    emit_artifact(conn, self.scenario, step, art, log_templates, allow_variant=True)
-                    conn.commit()
+                emit_artifact(
+                    conn, self.scenario, step, art, self._log_templates, allow_variant=True
+                )
 
     def _emit_action_artifacts(
         self,
@@ -253,46 +300,34 @@ class OpenSecEnvironment:
         action_type = attacker_action.get("action_type")
         if not action_type or action_type == "no_op":
             return
-        graph = self.scenario.get("attack_graph") or {}
-        states = graph.get("states", {})
-        node = states.get(prior_state, {})
-        actions = node.get("actions", [])
+        actions = self._actions_by_state.get(prior_state, {}).get(action_type)
         if not actions:
             return
-        log_templates = {t["template_id"]: t for t in self.scenario["seed_artifacts"]["log_templates"]}
         params = attacker_action.get("params") or {}
-        for action in actions:
-            if action.get("action_type") != action_type:
-                continue
-            match_params = action.get("match_params") or {}
-            if match_params:
-                if any(params.get(k) != v for k, v in match_params.items()):
-                    continue
-            for art in action.get("artifacts", []):
-                art_match = art.get("match_params") or {}
-                if art_match:
-                    if any(params.get(k) != v for k, v in art_match.items()):
+        conn = self._db()
+        with conn:
+            for action in actions:
+                match_params = action.get("match_params") or {}
+                if match_params:
+                    if any(params.get(k) != v for k, v in match_params.items()):
                         continue
-                with sqlite3.connect(self.db_path) as conn:
-                    emit_artifact(conn, self.scenario, step, art, log_templates, allow_variant=True)
-                    conn.commit()
+                for art in action.get("artifacts", []):
+                    art_match = art.get("match_params") or {}
+                    if art_match:
+                        if any(params.get(k) != v for k, v in art_match.items()):
+                            continue
+                    emit_artifact(
+                        conn, self.scenario, step, art, self._log_templates, allow_variant=True
+                    )
 
     def _uses_attack_graph(self) -> bool:
-        return bool(self.scenario and self.scenario.get("attack_graph"))
+        return self._uses_graph
 
     def _attacker_policy_context(self) -> Dict[str, Any]:
-        entities = (self.scenario or {}).get("entities", {})
-        hosts = [h["host_id"] for h in entities.get("hosts", []) if h.get("host_id")]
-        users = [u["user_id"] for u in entities.get("users", []) if u.get("user_id")]
-        attacker_domains = [
-            d["domain"]
-            for d in entities.get("domains", [])
-            if d.get("domain_type") == "attacker"
-        ]
-        available_hosts = [h for h in hosts if h not in self.containment.isolated_hosts]
-        available_users = [u for u in users if u not in self.containment.reset_users]
+        available_hosts = [h for h in self._all_hosts if h not in self._isolated_hosts]
+        available_users = [u for u in self._all_users if u not in self._reset_users]
         available_domains = [
-            d for d in attacker_domains if d not in self.containment.blocked_domains
+            d for d in self._attacker_domains if d not in self._blocked_domains
         ]
         return {
             "step": self.step_count,
@@ -301,9 +336,9 @@ class OpenSecEnvironment:
                 "blocked_domains": sorted(self.containment.blocked_domains),
                 "reset_users": sorted(self.containment.reset_users),
             },
-            "available_hosts": sorted(available_hosts),
-            "available_users": sorted(available_users),
-            "available_attacker_domains": sorted(available_domains),
+            "available_hosts": available_hosts,
+            "available_users": available_users,
+            "available_attacker_domains": available_domains,
             "compromised_hosts": sorted(self.attacker_context.compromised_hosts),
             "compromised_users": sorted(self.attacker_context.compromised_users),
             "current_host": self.attacker_context.current_host,
@@ -326,140 +361,260 @@ class OpenSecEnvironment:
             truncated=self.step_count >= self.max_steps,
         )
 
+    def _reset_containment_sets(self) -> None:
+        # Set mirrors of the ContainmentState lists for O(1) membership; the
+        # lists keep action order for observations and scoring.
+        self._isolated_hosts: Set[str] = set()
+        self._blocked_domains: Set[str] = set()
+        self._reset_users: Set[str] = set()
+        # Views the live sets, so one instance serves every step of the episode
+        self._containment_actions = ContainmentActions(
+            isolated_hosts=self._isolated_hosts,
+            blocked_domains=self._blocked_domains,
+            reset_users=self._reset_users,
+        )
+
     def apply_action(self, action: AgentAction) -> Dict[str, Any]:
-        if action.action_type == "isolate_host":
-            host_id = action.params.get("host_id")
-            if host_id and host_id not in self.containment.isolated_hosts:
-                self.containment.isolated_hosts.append(host_id)
-            return {"ok": True, "isolated_host": host_id}
-        if action.action_type == "block_domain":
-            domain = action.params.get("domain")
-            if domain and domain not in self.containment.blocked_domains:
-                self.containment.blocked_domains.append(domain)
-            return {"ok": True, "blocked_domain": domain}
-        if action.action_type == "reset_user":
-            user_id = action.params.get("user_id")
-            if user_id and user_id not in self.containment.reset_users:
-                self.containment.reset_users.append(user_id)
-            return {"ok": True, "reset_user": user_id}
-        if action.action_type == "query_logs":
-            sql = action.params.get("sql", "")
-            if not self._is_readonly_select(sql):
-                return {"ok": False, "error": "only SELECT queries are allowed"}
-            try:
-                rows = self._query_logs(sql)
-            except sqlite3.OperationalError as exc:
-                return {"ok": False, "error": str(exc)}
-            self._record_content_evidence_from_rows(rows)
-            return {"ok": True, "rows": rows}
-        if action.action_type == "fetch_email":
-            email_id = action.params.get("email_id")
-            if not email_id:
-                return {"ok": False, "error": "email_id required"}
-            self.content_evidence_ids.add(email_id)
-            email = self._fetch_email(email_id)
-            return {"ok": True, "email_id": email_id, "email": email}
-        if action.action_type == "fetch_alert":
-            alert_id = action.params.get("alert_id")
-            if not alert_id:
-                return {"ok": False, "error": "alert_id required"}
-            self.content_evidence_ids.add(alert_id)
-            alert = self._fetch_alert(alert_id)
-            parsed = self._parse_alert_fields(alert.get("message", "")) if alert else {}
-            return {"ok": True, "alert_id": alert_id, "alert": alert, "parsed": parsed}
-        return {"ok": True}
+        handler = self._ACTION_HANDLERS.get(action.action_type)
+        if handler is None:
+            return {"ok": True}
+        return handler(self, action)
+
+    def _act_isolate_host(self, action: AgentAction) -> Dict[str, Any]:
+        host_id = action.params.get("host_id")
+        if host_id and host_id not in self._isolated_hosts:
+            self._isolated_hosts.add(host_id)
+            self.containment.isolated_hosts.append(host_id)
+        return {"ok": True, "isolated_host": host_id}
+
+    def _act_block_domain(self, action: AgentAction) -> Dict[str, Any]:
+        domain = action.params.get("domain")
+        if domain and domain not in self._blocked_domains:
+            self._blocked_domains.add(domain)
+            self.containment.blocked_domains.append(domain)
+        return {"ok": True, "blocked_domain": domain}
+
+    def _act_reset_user(self, action: AgentAction) -> Dict[str, Any]:
+        user_id = action.params.get("user_id")
+        if user_id and user_id not in self._reset_users:
+            self._reset_users.add(user_id)
+            self.containment.reset_users.append(user_id)
+        return {"ok": True, "reset_user": user_id}
+
+    def _act_query_logs(self, action: AgentAction) -> Dict[str, Any]:
+        sql = action.params.get("sql", "")
+        if not self._is_readonly_select(sql):
+            return {"ok": False, "error": "only SELECT queries are allowed"}
+        try:
+            rows = self._query_logs(sql)
+        except sqlite3.OperationalError as exc:
+            return {"ok": False, "error": str(exc)}
+        self._record_content_evidence_from_rows(rows)
+        return {"ok": True, "rows": rows}
+
+    def _act_fetch_email(self, action: AgentAction) -> Dict[str, Any]:
+        email_id = action.params.get("email_id")
+        if not email_id:
+            return {"ok": False, "error": "email_id required"}
+        self._add_content_evidence(email_id)
+        email = self._fetch_email(email_id)
+        return {"ok": True, "email_id": email_id, "email": email}
+
+    def _act_fetch_alert(self, action: AgentAction) -> Dict[str, Any]:
+        alert_id = action.params.get("alert_id")
+        if not alert_id:
+            return {"ok": False, "error": "alert_id required"}
+        self._add_content_evidence(alert_id)
+        alert = self._fetch_alert(alert_id)
+        parsed = self._parse_alert_fields(alert.get("message", "")) if alert else {}
+        return {"ok": True, "alert_id": alert_id, "alert": alert, "parsed": parsed}
+
+    # Plain functions (called with self) rather than per-instance bound methods,
+    # so the table is built once and holds no reference back to the env
+    _ACTION_HANDLERS = {
+        "isolate_host": _act_isolate_host,
+        "block_domain": _act_block_domain,
+        "reset_user": _act_reset_user,
+        "query_logs": _act_query_logs,
+        "fetch_email": _act_fetch_email,
+        "fetch_alert": _act_fetch_alert,
+    }
 
     def _load_scenario(self) -> None:
         path = Path(self.seed_path)
         self.scenario = json_load(path)
         self.scenario_id = self.scenario["scenario_id"]
         self.max_steps = self.scenario.get("metadata", {}).get("max_steps", self.max_steps)
-        gt_path = _resolve_ground_truth_path(Path(self.seed_path))
-        if gt_path is not None and gt_path.exists():
-            self.ground_truth = json_load(gt_path)
+        self._index_scenario()
+        # Only submit_report scores against the ground truth, so it is read
+        # on first use rather than on every reset
+        self._ground_truth_path = _resolve_ground_truth_path(path)
+        self._ground_truth_cache = None
+
+    @property
+    def ground_truth(self) -> Optional[Dict[str, Any]]:
+        if self._ground_truth_cache is None:
+            gt_path = self._ground_truth_path
+            if gt_path is not None and gt_path.exists():
+                self._ground_truth_cache = json_load(gt_path)
+            else:
+                self._ground_truth_cache = _MISSING
+        if self._ground_truth_cache is _MISSING:
+            return None
+        return self._ground_truth_cache
+
+    def _index_scenario(self) -> None:
+        # The seed is fixed for the episode, so the lookups the per-step
+        # artifact emitters need are built once here.
+        scenario = self.scenario
+        self._log_templates = {
+            t["template_id"]: t for t in scenario["seed_artifacts"]["log_templates"]
+        }
+        self._timeline_by_step = {}
+        for item in scenario.get("attack_plan", {}).get("timeline", []):
+            self._timeline_by_step.setdefault(item["step"], []).extend(item["artifacts"])
+        self._actions_by_state = {}
+        self._attack_graph = scenario.get("attack_graph")
+        self._uses_graph = bool(self._attack_graph)
+        for state_name, node in (self._attack_graph or {}).get("states", {}).items():
+            by_type: Dict[str, List[Dict[str, Any]]] = {}
+            for action in node.get("actions", []):
+                by_type.setdefault(action.get("action_type"), []).append(action)
+            self._actions_by_state[state_name] = by_type
+        # Pre-sorted so the per-step policy context only filters out
+        # contained entities
+        entities = scenario.get("entities", {})
+        self._all_hosts = tuple(
+            sorted(h["host_id"] for h in entities.get("hosts", []) if h.get("host_id"))
+        )
+        self._all_users = tuple(
+            sorted(u["user_id"] for u in entities.get("users", []) if u.get("user_id"))
+        )
+        self._attacker_domains = tuple(
+            sorted(
+                d["domain"]
+                for d in entities.get("domains", [])
+                if d.get("domain_type") == "attacker"
+            )
+        )
 
     def _init_db(self) -> None:
         sqlite_dir = Path(self.sqlite_dir)
         sqlite_dir.mkdir(parents=True, exist_ok=True)
         self.db_path = str(sqlite_dir / f"{self.scenario_id}-{self.episode_id}.db")
         compile_seed(Path(self.seed_path), Path(self.db_path))
+        self._open_db()
         if self.cache is None:
-            self.cache = ReplayCache(self.db_path)
-        self.policy_manager = AttackerPolicyManager(cache=self.cache)
+            self._open_cache()
+        else:
+            self.policy_manager = AttackerPolicyManager(cache=self.cache)
+        # Policy settings come from the environment and are fixed per episode
         self.policy = resolve_attacker_policy()
+        self.policy_model, self.policy_temperature = resolve_attacker_policy_config()
+
+    def _open_db(self) -> None:
+        # One connection per episode DB, reused by every query and artifact
+        # emit. The server drives a single session from worker threads, so
+        # the connection is not pinned to the thread that opened it.
+        self._close_db()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # Scratch DB rebuilt every episode: durability is not needed
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+
+    def _close_db(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        # close() only releases the connection; the episode DB stays on disk,
+        # so the episode carries on by reopening it on next use
+        assert self.db_path is not None
+        if self._conn is None:
+            self._open_db()
+        return self._conn
+
+    def _open_cache(self) -> None:
+        if self._cache_path:
+            self.cache = ReplayCache(self._cache_path)
+        else:
+            # Keep the per-episode scratch DB in rollback-journal mode so it
+            # leaves no -wal/-shm files behind
+            self.cache = ReplayCache(self.db_path, wal=False)
+        self.policy_manager = AttackerPolicyManager(cache=self.cache)
+
+    def close(self) -> None:
+        self._close_db()
+        # The environment always creates its cache, so it also closes it: this
+        # commits buffered decisions and releases both cache connections. The
+        # next step() or reset() opens it again.
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
 
     def _query_logs(self, sql: str, params: tuple | None = None) -> List[Dict[str, Any]]:
-        assert self.db_path is not None
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            rows = conn.execute(sql, params or ()).fetchall()
-            return [dict(r) for r in rows]
+        rows = self._db().execute(sql, params or ()).fetchall()
+        return [dict(r) for r in rows]
 
     def _fetch_alert(self, alert_id: str) -> Dict[str, Any] | None:
-        rows = self._query_logs(
-            "SELECT * FROM alerts WHERE scenario_id = ? AND alert_id = ?",
-            params=(self.scenario_id, alert_id),
-        )
+        rows = self._query_logs(_SQL_FETCH_ALERT, params=(self.scenario_id, alert_id))
         return rows[0] if rows else None
 
     def _fetch_email(self, email_id: str) -> Dict[str, Any] | None:
-        rows = self._query_logs(
-            "SELECT * FROM email_logs WHERE scenario_id = ? AND email_id = ?",
-            params=(self.scenario_id, email_id),
-        )
+        rows = self._query_logs(_SQL_FETCH_EMAIL, params=(self.scenario_id, email_id))
         return rows[0] if rows else None
 
     def _parse_alert_fields(self, message: str) -> Dict[str, str]:
         # Extract key=value pairs from the alert message for structured access.
         if not message:
             return {}
-        matches = re.findall(r"([a-zA-Z_]+)=([a-zA-Z0-9_.:@-]+)", message)
-        parsed: Dict[str, str] = {}
-        for key, value in matches:
-            parsed[key] = value
-        return parsed
+        return dict(_ALERT_KV_RE.findall(message))
 
     def _emails_for_step(self, step: int) -> List[str]:
-        rows = self._query_logs(
-            "SELECT email_id FROM email_logs WHERE scenario_id = ? AND step = ?",
-            params=(self.scenario_id, step),
-        )
+        rows = self._query_logs(_SQL_EMAILS_FOR_STEP, params=(self.scenario_id, step))
         return [r["email_id"] for r in rows]
 
     def _alerts_for_step(self, step: int) -> List[str]:
-        rows = self._query_logs(
-            "SELECT alert_id FROM alerts WHERE scenario_id = ? AND step = ?",
-            params=(self.scenario_id, step),
-        )
+        rows = self._query_logs(_SQL_ALERTS_FOR_STEP, params=(self.scenario_id, step))
         return [r["alert_id"] for r in rows]
 
     def _is_readonly_select(self, sql: str) -> bool:
-        stripped = sql.strip().lower()
-        return stripped.startswith("select")
+        # Only the leading keyword matters; avoid lowercasing the whole query
+        return sql.lstrip()[:6].lower() == "select"
 
     def _record_evidence(self, new_emails: List[str], new_alerts: List[str]) -> None:
-        for eid in new_emails:
-            self.seen_evidence_ids.add(eid)
-        for aid in new_alerts:
-            self.seen_evidence_ids.add(aid)
+        for eid in (*new_emails, *new_alerts):
+            if eid not in self.seen_evidence_ids:
+                self.seen_evidence_ids.add(eid)
+                insort(self._seen_sorted, eid)
+
+    def _add_content_evidence(self, evidence_id: str) -> None:
+        if evidence_id not in self.content_evidence_ids:
+            self.content_evidence_ids.add(evidence_id)
+            insort(self._content_sorted, evidence_id)
 
     def _record_content_evidence_from_rows(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        # Rows come from a single SELECT and share one column set, so the id
+        # columns are resolved once from the first row
+        id_cols = [col for col in _EVIDENCE_ID_COLUMNS if col in rows[0]]
         for row in rows:
-            if "email_id" in row:
-                self.content_evidence_ids.add(str(row["email_id"]))
-            if "alert_id" in row:
-                self.content_evidence_ids.add(str(row["alert_id"]))
-            if "auth_id" in row:
-                self.content_evidence_ids.add(str(row["auth_id"]))
-            if "flow_id" in row:
-                self.content_evidence_ids.add(str(row["flow_id"]))
-            if "event_id" in row:
-                self.content_evidence_ids.add(str(row["event_id"]))
+            for col in id_cols:
+                self._add_content_evidence(str(row[col]))
 
 
-def json_load(path: Path) -> Dict[str, Any]:
-    import json
+def _state_dict(state: EpisodeState) -> Dict[str, Any]:
+    # EpisodeState holds only scalar fields, so a shallow copy of __dict__
+    # equals model_dump() without pydantic's serializer pass.
+    return dict(state.__dict__)
 
+
+def json_load(path: Path) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
     with path.open() as f:
         return json.load(f)
 
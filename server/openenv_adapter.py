@@ -56,4 +56,4 @@ class OpenSecOpenEnv(OpenEnvEnvironment):  # type: ignore[misc]
         return self._env.state()
 
     def close(self) -> None:
-        return None
+        self._env.close()
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
+import atexit
 import json
+import logging
 import re
 import os
 import sqlite3
+import threading
 import time
-from dataclasses import dataclass
-from hashlib import sha256
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import blake2b, sha256
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 try:
     from openai import BadRequestError, OpenAI
@@ -54,24 +66,121 @@ ATTACKER_SYSTEM_PROMPT = (
     "Return ONLY valid JSON with keys: action_type, params. Do not include extra keys or long rationale."
 )
 
+# Replay cache lookups run on every attacker decision. Passing the same text
+# to the long-lived connection lets sqlite3's statement cache reuse the
+# prepared statement instead of re-parsing it.
+# The unique key index would win the planner's choice, so the lookup names
+# the covering index that also holds decision_json.
+_SQL_SELECT_DECISION = (
+    "SELECT decision_json FROM attacker_decisions INDEXED BY idx_attacker_cache_cover "
+    "WHERE scenario_id = ? AND step = ? AND attacker_state = ? "
+    "AND agent_action_hash = ? AND attacker_context_hash = ?"
+)
+# decision_id is an INTEGER PRIMARY KEY (rowid alias) that SQLite assigns.
+# Tables created before that change keep a TEXT key, which gets a random id.
+_SQL_UPSERT_DECISION = (
+    "INSERT OR REPLACE INTO attacker_decisions "
+    "(scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash, "
+    "decision_json, model, temperature, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_UPSERT_DECISION_TEXT_ID = (
+    "INSERT OR REPLACE INTO attacker_decisions "
+    "(decision_id, scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash, "
+    "decision_json, model, temperature, created_at) "
+    "VALUES (lower(hex(randomblob(16))), ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+_SORTED_STATE_ALLOWED = {state: tuple(sorted(actions)) for state, actions in STATE_ALLOWED.items()}
+_SORTED_ALLOWED_ACTIONS = tuple(sorted(ALLOWED_ACTIONS))
+
+
+def _allowed_actions_for_state(
+    attacker_state: str, scenario: Optional[Dict[str, Any]] = None
+) -> tuple[str, ...]:
+    if not scenario:
+        return _SORTED_STATE_ALLOWED.get(attacker_state, _SORTED_ALLOWED_ACTIONS)
+    memo = _entity_index(scenario).allowed_by_state
+    allowed = memo.get(attacker_state)
+    if allowed is None:
+        allowed = memo[attacker_state] = _compute_allowed_actions(attacker_state, scenario)
+    return allowed
 
-def _allowed_actions_for_state(attacker_state: str, scenario: Optional[Dict[str, Any]] = None) -> list[str]:
-    if scenario and scenario.get("attack_graph"):
+
+def _compute_allowed_actions(attacker_state: str, scenario: Dict[str, Any]) -> tuple[str, ...]:
+    if scenario.get("attack_graph"):
         graph = scenario["attack_graph"]
         state_node = graph.get("states", {}).get(attacker_state, {})
         actions = state_node.get("actions", [])
         if actions:
-            return sorted({a.get("action_type") for a in actions if a.get("action_type")})
-    return sorted(STATE_ALLOWED.get(attacker_state, ALLOWED_ACTIONS))
+            return tuple(sorted({a.get("action_type") for a in actions if a.get("action_type")}))
+    return _SORTED_STATE_ALLOWED.get(attacker_state, _SORTED_ALLOWED_ACTIONS)
+
+
+@dataclass(frozen=True)
+class _EntityIndex:
+    users: frozenset[str]
+    hosts: frozenset[str]
+    targets: frozenset[str]
+    domains: frozenset[str]
+    users_sorted: tuple[str, ...]
+    hosts_sorted: tuple[str, ...]
+    targets_sorted: tuple[str, ...]
+    domains_sorted: tuple[str, ...]
+    # Per-state results of _allowed_actions_for_state/_action_schema_for_state,
+    # filled on first use. Both are pure in (scenario, attacker_state).
+    allowed_by_state: Dict[str, tuple[str, ...]] = field(default_factory=dict)
+    schema_by_state: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+# Entity id sets per scenario, keyed by id(). Plain dicts cannot be weakly
+# referenced, so each entry keeps its scenario alive and is checked by
+# identity; the map is small and cleared when it fills up.
+_ENTITY_INDEX_CACHE: Dict[int, tuple[Dict[str, Any], _EntityIndex]] = {}
+_ENTITY_INDEX_CACHE_SIZE = 64
+
+
+def _entity_index(scenario: Dict[str, Any]) -> _EntityIndex:
+    entry = _ENTITY_INDEX_CACHE.get(id(scenario))
+    if entry is not None and entry[0] is scenario:
+        return entry[1]
+    entities = scenario.get("entities", {})
+    users = frozenset(u["user_id"] for u in entities.get("users", []))
+    hosts = frozenset(h["host_id"] for h in entities.get("hosts", []))
+    targets = frozenset(t["target_id"] for t in entities.get("data_targets", []))
+    domains = frozenset(d["domain"] for d in entities.get("domains", []))
+    index = _EntityIndex(
+        users=users,
+        hosts=hosts,
+        targets=targets,
+        domains=domains,
+        users_sorted=tuple(sorted(users)),
+        hosts_sorted=tuple(sorted(hosts)),
+        targets_sorted=tuple(sorted(targets)),
+        domains_sorted=tuple(sorted(domains)),
+    )
+    if len(_ENTITY_INDEX_CACHE) >= _ENTITY_INDEX_CACHE_SIZE:
+        _ENTITY_INDEX_CACHE.clear()
+    _ENTITY_INDEX_CACHE[id(scenario)] = (scenario, index)
+    return index
 
 
 def _action_schema_for_state(attacker_state: str, scenario: Dict[str, Any]) -> Dict[str, Any]:
+    memo = _entity_index(scenario).schema_by_state
+    schema = memo.get(attacker_state)
+    if schema is None:
+        schema = memo[attacker_state] = _build_action_schema(attacker_state, scenario)
+    return schema
+
+
+def _build_action_schema(attacker_state: str, scenario: Dict[str, Any]) -> Dict[str, Any]:
     allowed = _allowed_actions_for_state(attacker_state, scenario)
-    entities = scenario.get("entities", {})
-    users = sorted({u["user_id"] for u in entities.get("users", [])})
-    hosts = sorted({h["host_id"] for h in entities.get("hosts", [])})
-    targets = sorted({t["target_id"] for t in entities.get("data_targets", [])})
-    domains = sorted({d["domain"] for d in entities.get("domains", [])})
+    index = _entity_index(scenario)
+    users = list(index.users_sorted)
+    hosts = list(index.hosts_sorted)
+    targets = list(index.targets_sorted)
+    domains = list(index.domains_sorted)
 
     schema: Dict[str, Any] = {}
     for action in allowed:
@@ -96,21 +205,58 @@ def _action_schema_for_state(attacker_state: str, scenario: Dict[str, Any]) -> D
     return schema
 
 
+# Replay DBs recorded before cache keys moved to BLAKE2b store sha256 keys.
+# While set, a replay miss is retried with the legacy keys so those DBs stay
+# readable.
+LEGACY_SHA256_KEYS = True
+
+
 def canonical_json(obj: Dict[str, Any]) -> str:
     return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
 
 
+def _dumps_decision(decision: Dict[str, Any]) -> str:
+    # Stored decision_json is only ever parsed back, so orjson's compact form
+    # is as good as the stdlib's and is produced in one C pass.
+    if orjson is not None:
+        try:
+            return orjson.dumps(decision, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(decision, sort_keys=True)
+
+
+# Never updated; _digest clones it, which is cheaper than building a new
+# hash object with the same parameters.
+_BLAKE2B_128 = blake2b(digest_size=16)
+
+
+@lru_cache(maxsize=4096)
+def _digest(canonical: bytes) -> str:
+    # Agent actions and attacker contexts repeat across steps and rollouts;
+    # keying on the canonical bytes skips the hash for repeats. The digest is
+    # only a cache key, so a 128-bit BLAKE2b is plenty.
+    h = _BLAKE2B_128.copy()
+    h.update(canonical)
+    return h.hexdigest()
+
+
 def hash_agent_action(agent_action: Dict[str, Any]) -> str:
-    return sha256(canonical_json(agent_action).encode("utf-8")).hexdigest()
+    return _digest(canonical_json(agent_action).encode("utf-8"))
 
 
 def hash_attacker_context(attacker_context: Optional[Dict[str, Any]]) -> str:
     if not attacker_context:
         return "none"
-    return sha256(canonical_json(attacker_context).encode("utf-8")).hexdigest()
+    return _digest(canonical_json(attacker_context).encode("utf-8"))
 
 
-@dataclass
+def _legacy_hash(obj: Dict[str, Any]) -> str:
+    return sha256(canonical_json(obj).encode("utf-8")).hexdigest()
+
+
+# One per attacker step, and rollouts can hold long histories of them
+@dataclass(slots=True)
 class AttackerDecision:
     action_type: str
     params: Dict[str, Any]
@@ -132,34 +278,205 @@ class AttackerDecision:
         return payload
 
 
+logger = logging.getLogger(__name__)
+
+# Consecutive failed commits after which the background writer gives up
+_WRITER_MAX_RETRIES = 5
+
+# Caches not yet closed, flushed at interpreter exit. Held weakly so the
+# exit hook does not keep every cache (and its connections) alive.
+_OPEN_CACHES: "weakref.WeakSet[ReplayCache]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_caches() -> None:
+    for cache in list(_OPEN_CACHES):
+        cache.close()
+
+
+def _open_cache_connection(db_path: str, wal: bool) -> sqlite3.Connection:
+    # Autocommit mode so no transaction is held open between calls
+    conn = sqlite3.connect(
+        db_path, check_same_thread=False, isolation_level=None, cached_statements=256
+    )
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-16000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
 class ReplayCache:
-    def __init__(self, db_path: str) -> None:
+    def __init__(
+        self,
+        db_path: str,
+        flush_threshold: int = 64,
+        mem_size: int = 4096,
+        flush_interval: float = 0.05,
+        wal: bool = True,
+    ) -> None:
         self.db_path = db_path
-        self._ensure_context_hash()
+        # Two long-lived connections: lookups use _conn under _lock, while
+        # _writer_conn belongs to the background writer (and flush()), under
+        # _write_lock. WAL lets reads proceed while a batch commits. Pass
+        # wal=False when the cache shares a scratch DB that must stay a single
+        # file; readers then wait out each commit on the busy timeout.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._conn = _open_cache_connection(db_path, wal)
+        self._writer_conn = _open_cache_connection(db_path, wal)
+        # Decisions written by set() wait here, keyed like the unique index,
+        # until the writer commits them. They stay readable by get() meanwhile.
+        self._pending: Dict[tuple, tuple] = {}
+        self._flush_threshold = flush_threshold
+        self._flush_interval = flush_interval
+        # Parsed decisions for recently used keys, most recent last. Replayed
+        # rollouts revisit the same keys, so hits skip SQLite entirely.
+        self._mem: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._mem_size = mem_size
+        self._upsert_sql = _SQL_UPSERT_DECISION
+        self._schema_ready = False
+        self._ensure_schema()
+        # set() only buffers and signals; the writer thread does the commits,
+        # so the attacker decision path never waits on disk. set() starts it
+        # on demand and it exits once the buffer is drained, so an idle cache
+        # holds no thread and no reference to itself.
+        self._wake = threading.Condition(self._lock)
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+        # Set when the writer gives up; get()/set() raise it until a flush()
+        # succeeds
+        self._error: Optional[sqlite3.Error] = None
+        _OPEN_CACHES.add(self)
 
     def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
-
-    def _ensure_context_hash(self) -> None:
-        with self._connect() as conn:
-            table = conn.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='attacker_decisions'"
-            ).fetchone()
-            if not table:
-                return
-            cols = [row[1] for row in conn.execute("PRAGMA table_info(attacker_decisions)")]
-            if "attacker_context_hash" not in cols:
-                conn.execute(
-                    "ALTER TABLE attacker_decisions ADD COLUMN attacker_context_hash TEXT NOT NULL DEFAULT 'none'"
+        return self._conn
+
+    def _raise_writer_error(self) -> None:
+        # Called with _lock held
+        if self._error is not None:
+            raise RuntimeError("replay_cache_write_failed") from self._error
+
+    def _writer_loop(self) -> None:
+        failures = 0
+        while True:
+            with self._wake:
+                if not self._pending or self._closed:
+                    self._writer = None
+                    return
+                # Give a partial batch a short window to fill up
+                deadline = time.monotonic() + self._flush_interval
+                while not self._closed and len(self._pending) < self._flush_threshold:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wake.wait(timeout=remaining)
+                if self._closed:
+                    self._writer = None
+                    return
+            try:
+                self.flush()
+            except sqlite3.Error as exc:
+                # Rows stay buffered. Transient errors (a busy database) get a
+                # few retries; a persistent one is handed to the next caller.
+                failures += 1
+                if failures < _WRITER_MAX_RETRIES:
+                    logger.warning("replay cache commit to %s failed, retrying: %s", self.db_path, exc)
+                    time.sleep(self._flush_interval)
+                    continue
+                logger.error(
+                    "replay cache commit to %s failed %d times; %d decisions stay buffered",
+                    self.db_path,
+                    failures,
+                    len(self._pending),
+                    exc_info=exc,
                 )
-                conn.execute("DROP INDEX IF EXISTS idx_attacker_cache")
-                conn.execute(
-                    """
-                    CREATE UNIQUE INDEX IF NOT EXISTS idx_attacker_cache
-                    ON attacker_decisions (scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash)
-                    """
-                )
-                conn.commit()
+                with self._wake:
+                    self._error = exc
+                    self._writer = None
+                return
+            failures = 0
+
+    def flush(self) -> None:
+        """Commit every buffered decision before returning."""
+        with self._write_lock:
+            with self._lock:
+                batch = dict(self._pending)
+            if not batch:
+                return
+            if not self._schema_ready:
+                self._migrate_schema()
+            conn = self._writer_conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(self._upsert_sql, batch.values())
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            with self._lock:
+                self._error = None
+                for key, row in batch.items():
+                    # Keep rows that were replaced while the batch committed
+                    if self._pending.get(key) is row:
+                        del self._pending[key]
+
+    def close(self) -> None:
+        with self._wake:
+            if self._closed:
+                return
+            self._closed = True
+            writer = self._writer
+            self._wake.notify()
+        if writer is not None:
+            writer.join()
+        try:
+            self.flush()
+        finally:
+            with self._write_lock, self._lock:
+                self._writer_conn.close()
+                self._conn.close()
+            _OPEN_CACHES.discard(self)
+
+    def _ensure_schema(self) -> None:
+        with self._write_lock:
+            self._migrate_schema()
+
+    def _migrate_schema(self) -> None:
+        # Called with _write_lock held. The table may not exist yet when the
+        # cache opens (it can be created later, possibly from an older
+        # schema), so get() and flush() call this again until it does: reads
+        # name idx_attacker_cache_cover and fail without it.
+        conn = self._writer_conn
+        table = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='attacker_decisions'"
+        ).fetchone()
+        if not table:
+            return
+        info = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(attacker_decisions)")}
+        if info.get("decision_id", "").upper() != "INTEGER":
+            self._upsert_sql = _SQL_UPSERT_DECISION_TEXT_ID
+        if "attacker_context_hash" not in info:
+            conn.execute("BEGIN")
+            conn.execute(
+                "ALTER TABLE attacker_decisions ADD COLUMN attacker_context_hash TEXT NOT NULL DEFAULT 'none'"
+            )
+            conn.execute("DROP INDEX IF EXISTS idx_attacker_cache")
+            conn.execute(
+                """
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_attacker_cache
+                ON attacker_decisions (scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash)
+                """
+            )
+            conn.execute("COMMIT")
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_attacker_cache_cover
+            ON attacker_decisions (scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash, decision_json)
+            """
+        )
+        self._schema_ready = True
 
     def get(
         self,
@@ -169,18 +486,32 @@ class ReplayCache:
         agent_action_hash: str,
         attacker_context_hash: str,
     ) -> Optional[Dict[str, Any]]:
-        with self._connect() as conn:
-            cur = conn.execute(
-                """
-                SELECT decision_json FROM attacker_decisions
-                WHERE scenario_id = ? AND step = ? AND attacker_state = ? AND agent_action_hash = ? AND attacker_context_hash = ?
-                """,
-                (scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash),
-            )
-            row = cur.fetchone()
-            if not row:
-                return None
-            return json.loads(row[0])
+        key = (scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash)
+        if not self._schema_ready:
+            self._ensure_schema()
+        conn = self._connect()
+        with self._lock:
+            self._raise_writer_error()
+            decision = self._mem.get(key)
+            if decision is not None:
+                self._mem.move_to_end(key)
+                return decision
+            pending = self._pending.get(key)
+            if pending is not None:
+                decision = json.loads(pending[5])
+            else:
+                row = conn.execute(_SQL_SELECT_DECISION, key).fetchone()
+                if not row:
+                    return None
+                decision = json.loads(row[0])
+            self._remember(key, decision)
+        return decision
+
+    def _remember(self, key: tuple, decision: Dict[str, Any]) -> None:
+        self._mem[key] = decision
+        self._mem.move_to_end(key)
+        if len(self._mem) > self._mem_size:
+            self._mem.popitem(last=False)
 
     def set(
         self,
@@ -193,31 +524,39 @@ class ReplayCache:
         model: str,
         temperature: float,
     ) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO attacker_decisions
-                (decision_id, scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash,
-                 decision_json, model, temperature, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    str(int(time.time() * 1000)),
-                    scenario_id,
-                    step,
-                    attacker_state,
-                    agent_action_hash,
-                    attacker_context_hash,
-                    json.dumps(decision_json, sort_keys=True),
-                    model,
-                    temperature,
-                    time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-                ),
-            )
-            conn.commit()
+        key = (scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash)
+        row = (
+            *key,
+            _dumps_decision(decision_json),
+            model,
+            temperature,
+            time.time_ns() // 1_000_000,
+        )
+        with self._wake:
+            if self._closed:
+                raise RuntimeError("replay_cache_closed")
+            self._raise_writer_error()
+            # Re-setting a key replaces the pending row, matching INSERT OR REPLACE
+            self._pending.pop(key, None)
+            self._pending[key] = row
+            self._remember(key, decision_json)
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="replay-cache-writer", daemon=True
+                )
+                self._writer.start()
+            self._wake.notify()
+
+
+# (scenario, attacker_state, agent_action, attacker_context) for one decision
+AttackerQuery = Tuple[Dict[str, Any], str, Dict[str, Any], Optional[Dict[str, Any]]]
 
 
 class AttackerPolicy:
+    # Concurrent choose_action calls allowed by choose_action_batch. Local
+    # policies stay sequential; network-backed ones overlap their requests.
+    max_batch_workers = 1
+
     def choose_action(
         self,
         scenario: Dict[str, Any],
@@ -227,6 +566,13 @@ class AttackerPolicy:
     ) -> AttackerDecision:
         raise NotImplementedError
 
+    def choose_action_batch(self, queries: Sequence[AttackerQuery]) -> List[AttackerDecision]:
+        if self.max_batch_workers <= 1 or len(queries) <= 1:
+            return [self.choose_action(*query) for query in queries]
+        workers = min(self.max_batch_workers, len(queries))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(lambda query: self.choose_action(*query), queries))
+
 
 class MockAttackerPolicy(AttackerPolicy):
     def choose_action(
@@ -259,34 +605,40 @@ class MockAttackerPolicy(AttackerPolicy):
                 d["domain"] for d in entities["domains"] if d["domain_type"] == "attacker"
             )
 
-        if attacker_state == "phish_sent":
-            return AttackerDecision("reuse_credentials", {"user": user, "host": host})
-        if attacker_state == "recon":
-            return AttackerDecision("send_phish", {"target_user": user})
-        if attacker_state == "access":
-            return AttackerDecision("reuse_credentials", {"user": user, "host": host})
-        if attacker_state == "persistence":
-            return AttackerDecision("establish_persistence", {"host": host})
-        if attacker_state == "lateral_spread":
-            return AttackerDecision("lateral_move", {"src": host, "dst": dst_host})
-        if attacker_state == "staging":
-            return AttackerDecision("stage_data", {"target": target, "host": host})
-        if attacker_state == "exfil":
-            return AttackerDecision(
-                "exfiltrate", {"channel": "https", "destination_domain": attacker_domain}
-            )
-        if attacker_state == "creds_used":
-            return AttackerDecision("lateral_move", {"src": host, "dst": dst_host})
-        if attacker_state == "lateral_move":
-            return AttackerDecision("access_data", {"target": target})
-        if attacker_state == "data_access":
-            return AttackerDecision(
-                "exfiltrate", {"channel": "https", "destination_domain": attacker_domain}
-            )
-        return AttackerDecision("no_op", {})
+        targets = _MockTargets(user, host, dst_host, target, attacker_domain)
+        step = _MOCK_STEPS.get(attacker_state)
+        if step is None:
+            return AttackerDecision("no_op", {})
+        action_type, params = step(targets)
+        return AttackerDecision(action_type, params)
+
+
+class _MockTargets(NamedTuple):
+    user: str
+    host: str
+    dst_host: str
+    target: str
+    domain: str
+
+
+# Scripted move for each attacker state; anything else is a no_op
+_MOCK_STEPS: Dict[str, Callable[[_MockTargets], Tuple[str, Dict[str, Any]]]] = {
+    "phish_sent": lambda t: ("reuse_credentials", {"user": t.user, "host": t.host}),
+    "recon": lambda t: ("send_phish", {"target_user": t.user}),
+    "access": lambda t: ("reuse_credentials", {"user": t.user, "host": t.host}),
+    "persistence": lambda t: ("establish_persistence", {"host": t.host}),
+    "lateral_spread": lambda t: ("lateral_move", {"src": t.host, "dst": t.dst_host}),
+    "staging": lambda t: ("stage_data", {"target": t.target, "host": t.host}),
+    "exfil": lambda t: ("exfiltrate", {"channel": "https", "destination_domain": t.domain}),
+    "creds_used": lambda t: ("lateral_move", {"src": t.host, "dst": t.dst_host}),
+    "lateral_move": lambda t: ("access_data", {"target": t.target}),
+    "data_access": lambda t: ("exfiltrate", {"channel": "https", "destination_domain": t.domain}),
+}
 
 
 class OpenAIAttackerPolicy(AttackerPolicy):
+    max_batch_workers = 8
+
     def __init__(
         self,
         model: str,
@@ -360,6 +712,8 @@ class OpenAIAttackerPolicy(AttackerPolicy):
 class SGLangAttackerPolicy(AttackerPolicy):
     """Attacker policy using SGLang server for fast inference during RL training."""
 
+    max_batch_workers = 8
+
     def __init__(self, model_name: str = "Qwen/Qwen3-1.7B", temperature: float = 0.3) -> None:
         self.model_name = model_name
         self.temperature = temperature
@@ -436,6 +790,16 @@ class SGLangAttackerPolicy(AttackerPolicy):
         return AttackerDecision(action_type, params, rationale="fallback")
 
 
+@dataclass
+class AttackerRequest:
+    scenario_id: str
+    step: int
+    attacker_state: str
+    agent_action: Dict[str, Any]
+    scenario: Dict[str, Any]
+    attacker_context: Optional[Dict[str, Any]] = None
+
+
 class AttackerPolicyManager:
     def __init__(self, cache: ReplayCache | None = None) -> None:
         self.cache = cache
@@ -452,29 +816,110 @@ class AttackerPolicyManager:
         model: str = "mock",
         temperature: float = 0.0,
     ) -> Dict[str, Any]:
-        agent_action_hash = hash_agent_action(agent_action)
-        attacker_context_hash = hash_attacker_context(attacker_context)
+        request = AttackerRequest(
+            scenario_id, step, attacker_state, agent_action, scenario, attacker_context
+        )
+        return self.decide_batch([request], policy, model=model, temperature=temperature)[0]
+
+    def decide_batch(
+        self,
+        requests: Sequence[AttackerRequest],
+        policy: AttackerPolicy,
+        model: str = "mock",
+        temperature: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        """Decide for several environments at once, e.g. parallel rollouts.
+
+        Replay hits are answered from the cache; the remaining requests go to
+        the policy in one choose_action_batch call. Results follow the order
+        of ``requests``.
+        """
         replay_mode = resolve_replay_mode()
-        if self.cache is not None and replay_mode == "replay":
+        keys = [
+            (hash_agent_action(r.agent_action), hash_attacker_context(r.attacker_context))
+            for r in requests
+        ]
+        results: Dict[int, Dict[str, Any]] = {}
+        misses: List[int] = []
+        for i, request in enumerate(requests):
+            if self.cache is not None and replay_mode == "replay":
+                cached = self._replayed(request, *keys[i])
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            misses.append(i)
+
+        if misses:
+            decisions = policy.choose_action_batch(
+                [
+                    (
+                        requests[i].scenario,
+                        requests[i].attacker_state,
+                        requests[i].agent_action,
+                        requests[i].attacker_context,
+                    )
+                    for i in misses
+                ]
+            )
+            for i, decision in zip(misses, decisions):
+                results[i] = self._settle(
+                    requests[i], *keys[i], decision, replay_mode, model, temperature
+                )
+        return [results[i] for i in range(len(requests))]
+
+    def _replayed(
+        self, request: AttackerRequest, agent_action_hash: str, attacker_context_hash: str
+    ) -> Optional[Dict[str, Any]]:
+        assert self.cache is not None
+        cached = self.cache.get(
+            request.scenario_id,
+            request.step,
+            request.attacker_state,
+            agent_action_hash,
+            attacker_context_hash,
+        )
+        if cached is None and LEGACY_SHA256_KEYS:
             cached = self.cache.get(
-                scenario_id, step, attacker_state, agent_action_hash, attacker_context_hash
+                request.scenario_id,
+                request.step,
+                request.attacker_state,
+                _legacy_hash(request.agent_action),
+                _legacy_hash(request.attacker_context) if request.attacker_context else "none",
             )
-            if cached is not None:
-                return cached
+        if cached is None:
+            return None
+        # Recorded decisions were validated when written; re-check them only
+        # when auditing a replay DB.
+        if resolve_validate_replay() and not _is_valid_action(
+            cached, request.scenario, request.attacker_state
+        ):
+            if resolve_attacker_strict():
+                raise RuntimeError("attacker_invalid_cached_action")
+            return NO_OP_ACTION
+        return cached
 
-        decision = policy.choose_action(scenario, attacker_state, agent_action, attacker_context)
+    def _settle(
+        self,
+        request: AttackerRequest,
+        agent_action_hash: str,
+        attacker_context_hash: str,
+        decision: AttackerDecision,
+        replay_mode: str,
+        model: str,
+        temperature: float,
+    ) -> Dict[str, Any]:
         decision_json = decision.as_json()
 
-        if not _is_valid_action(decision_json, scenario, attacker_state):
+        if not _is_valid_action(decision_json, request.scenario, request.attacker_state):
             if resolve_attacker_strict():
                 raise RuntimeError("attacker_invalid_action")
             decision_json = NO_OP_ACTION
 
         if self.cache is not None and replay_mode in ("record", "replay"):
             self.cache.set(
-                scenario_id=scenario_id,
-                step=step,
-                attacker_state=attacker_state,
+                scenario_id=request.scenario_id,
+                step=request.step,
+                attacker_state=request.attacker_state,
                 agent_action_hash=agent_action_hash,
                 attacker_context_hash=attacker_context_hash,
                 decision_json=decision_json,
@@ -485,50 +930,75 @@ class AttackerPolicyManager:
         return decision_json
 
 
+def _valid_target_user(params: Dict[str, Any], index: _EntityIndex) -> bool:
+    return params.get("target_user") in index.users
+
+
+def _valid_reuse_credentials(params: Dict[str, Any], index: _EntityIndex) -> bool:
+    return params.get("user") in index.users and params.get("host") in index.hosts
+
+
+def _valid_host_hop(params: Dict[str, Any], index: _EntityIndex) -> bool:
+    return params.get("src") in index.hosts and params.get("dst") in index.hosts
+
+
+def _valid_access_data(params: Dict[str, Any], index: _EntityIndex) -> bool:
+    return params.get("target") in index.targets
+
+
+def _valid_stage_data(params: Dict[str, Any], index: _EntityIndex) -> bool:
+    target = params.get("target")
+    host = params.get("host")
+    if target and target not in index.targets:
+        return False
+    if host and host not in index.hosts:
+        return False
+    return True
+
+
+def _valid_establish_persistence(params: Dict[str, Any], index: _EntityIndex) -> bool:
+    host = params.get("host")
+    return host in index.hosts if host else True
+
+
+def _valid_exfiltrate(params: Dict[str, Any], index: _EntityIndex) -> bool:
+    return params.get("destination_domain") in index.domains
+
+
+def _valid_any(params: Dict[str, Any], index: _EntityIndex) -> bool:
+    return True
+
+
+# Parameter check per attacker action; actions missing here are never valid
+_ACTION_VALIDATORS = {
+    "send_phish": _valid_target_user,
+    "rephish": _valid_target_user,
+    "recon": _valid_any,
+    "reuse_credentials": _valid_reuse_credentials,
+    "lateral_move": _valid_host_hop,
+    "lateral_move_alt": _valid_host_hop,
+    "lateral_spread": _valid_host_hop,
+    "pivot": _valid_host_hop,
+    "access_data": _valid_access_data,
+    "stage_data": _valid_stage_data,
+    "establish_persistence": _valid_establish_persistence,
+    "wait": _valid_any,
+    "retreat": _valid_any,
+    "exfiltrate": _valid_exfiltrate,
+    "exfiltrate_alt": _valid_exfiltrate,
+}
+
+
 def _is_valid_action(action: Dict[str, Any], scenario: Dict[str, Any], attacker_state: str) -> bool:
     action_type = action.get("action_type")
     if action_type in (None, "no_op"):
         return False
-    allowed = _allowed_actions_for_state(attacker_state, scenario)
-    if action_type not in allowed:
+    if action_type not in _allowed_actions_for_state(attacker_state, scenario):
         return False
-
-    params = action.get("params") or {}
-    entities = scenario.get("entities", {})
-    users = {u["user_id"] for u in entities.get("users", [])}
-    hosts = {h["host_id"] for h in entities.get("hosts", [])}
-    targets = {t["target_id"] for t in entities.get("data_targets", [])}
-    domains = {d["domain"] for d in entities.get("domains", [])}
-
-    if action_type == "send_phish":
-        return params.get("target_user") in users
-    if action_type == "rephish":
-        return params.get("target_user") in users
-    if action_type == "recon":
-        return True
-    if action_type == "reuse_credentials":
-        return params.get("user") in users and params.get("host") in hosts
-    if action_type in ("lateral_move", "lateral_move_alt", "lateral_spread", "pivot"):
-        return params.get("src") in hosts and params.get("dst") in hosts
-    if action_type == "access_data":
-        return params.get("target") in targets
-    if action_type == "stage_data":
-        target = params.get("target")
-        host = params.get("host")
-        if target and target not in targets:
-            return False
-        if host and host not in hosts:
-            return False
-        return True
-    if action_type == "establish_persistence":
-        host = params.get("host")
-        return host in hosts if host else True
-    if action_type in ("wait", "retreat"):
-        return True
-    if action_type in ("exfiltrate", "exfiltrate_alt"):
-        return params.get("destination_domain") in domains
-
-    return False
+    validator = _ACTION_VALIDATORS.get(action_type)
+    if validator is None:
+        return False
+    return validator(action.get("params") or {}, _entity_index(scenario))
 
 
 def init_cache_db(db_path: str) -> None:
@@ -540,13 +1010,29 @@ def init_cache_db(db_path: str) -> None:
         conn.commit()
 
 
+# .env files already applied to os.environ. The resolve_* helpers run on
+# every attacker decision, so the file is read at most once per process.
+_LOADED_ENV_FILES: set[str] = set()
+
+
+def reset_env_cache() -> None:
+    """Forget loaded .env files so the next load_env_file re-reads them."""
+    _LOADED_ENV_FILES.clear()
+
+
 def load_env_file(path: str = ".env") -> None:
     if os.getenv("OPENSEC_DISABLE_ENV_LOAD") == "1":
         return
+    if path in _LOADED_ENV_FILES:
+        return
     env_path = Path(path)
     if not env_path.exists():
         return
-    for line in env_path.read_text().splitlines():
+    text = env_path.read_text()
+    # Record the path only once it has been read, so a .env created after
+    # an earlier call is still picked up.
+    _LOADED_ENV_FILES.add(path)
+    for line in text.splitlines():
         if not line or line.strip().startswith("#") or "=" not in line:
             continue
         key, value = line.split("=", 1)
@@ -586,6 +1072,11 @@ def resolve_attacker_strict() -> bool:
     return os.getenv("OPENSEC_ATTACKER_STRICT", "0") == "1"
 
 
+def resolve_validate_replay() -> bool:
+    load_env_file()
+    return os.getenv("OPENSEC_VALIDATE_REPLAY", "0") == "1"
+
+
 def resolve_attacker_policy() -> AttackerPolicy:
     """Resolve attacker policy from environment (SGLang > OpenAI > Mock)."""
     load_env_file()
@@ -635,19 +1126,35 @@ def _log_attacker_response(label: str, text: str) -> None:
         return
 
 
+# Trailing comma before a closing brace/bracket
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+# Newline-separated fields missing their comma: after a string value, and
+# after a bare (number/bool/null) value
+_MISSING_COMMA_AFTER_STRING_RE = re.compile(r"(\")\s*\n(\s*\")")
+_MISSING_COMMA_AFTER_VALUE_RE = re.compile(r"(\"[^\"\n]*\"\s*:\s*[^,\n}{\[]+)\n(\s*\")")
+
+
 def _repair_json(text: str) -> str:
     # Remove trailing commas before closing braces/brackets.
-    text = re.sub(r",\s*([}\]])", r"\1", text)
+    text = _TRAILING_COMMA_RE.sub(r"\1", text)
     # Insert missing commas between top-level fields separated by newlines.
-    text = re.sub(r"(\")\s*\n(\s*\")", r"\1,\n\2", text)
-    text = re.sub(r"(\"[^\"\n]*\"\s*:\s*[^,\n}{\[]+)\n(\s*\")", r"\1,\n\2", text)
+    text = _MISSING_COMMA_AFTER_STRING_RE.sub(r"\1,\n\2", text)
+    text = _MISSING_COMMA_AFTER_VALUE_RE.sub(r"\1,\n\2", text)
     return text
 
 
+_JSON_DECODER = json.JSONDecoder()
+
+
 def _parse_attacker_json(text: str) -> Dict[str, Any]:
-    candidate = _extract_json(text)
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("no json found")
+    # Common case: one well-formed object, possibly with prose around it.
+    # raw_decode stops at its closing brace, so nothing is rescanned.
     try:
-        return json.loads(candidate)
+        return _JSON_DECODER.raw_decode(text, start)[0]
     except json.JSONDecodeError:
-        repaired = _repair_json(candidate)
-        return json.loads(repaired)
+        pass
+    # A span that parses as-is would already have been decoded above
+    return json.loads(_repair_json(_extract_json(text)))
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Collection, Dict, List, Optional
 
 STATES: List[str] = [
     "phish_sent",
@@ -16,9 +16,10 @@ STATE_INDEX: Dict[str, int] = {state: i for i, state in enumerate(STATES)}
 
 @dataclass
 class ContainmentActions:
-    isolated_hosts: List[str]
-    blocked_domains: List[str]
-    reset_users: List[str]
+    # Only membership is tested, so sets are accepted as well as lists
+    isolated_hosts: Collection[str]
+    blocked_domains: Collection[str]
+    reset_users: Collection[str]
 
 
 @dataclass
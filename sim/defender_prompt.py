@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from typing import Any, Dict, List
 
 ALLOWED_ACTIONS: List[str] = [
@@ -13,7 +14,22 @@ ALLOWED_ACTIONS: List[str] = [
     "submit_report",
 ]
 
+# Static part of every user prompt; built once rather than per observation.
+REPORT_SCHEMA: Dict[str, Any] = {
+    "patient_zero_host": "string",
+    "compromised_user": "string",
+    "attacker_domain": "string",
+    "data_target": "string",
+    "initial_vector": "phish",
+    "containment_actions": {
+        "isolated_hosts": ["host_id"],
+        "blocked_domains": ["domain"],
+        "reset_users": ["user_id"],
+    },
+}
 
+
+@lru_cache(maxsize=8)
 def build_system_prompt(max_steps: int = 15, report_deadline: int | None = None) -> str:
     deadline = report_deadline if report_deadline is not None else max(3, max_steps - 2)
     return (
@@ -50,17 +66,6 @@ def build_user_prompt(observation: Dict[str, Any], max_steps: int | None = None)
         "evidence_seen_ids": observation.get("evidence_seen_ids", []),
         "evidence_content_ids": observation.get("evidence_content_ids", []),
         "last_action_result": observation.get("last_action_result"),
-        "report_schema": {
-            "patient_zero_host": "string",
-            "compromised_user": "string",
-            "attacker_domain": "string",
-            "data_target": "string",
-            "initial_vector": "phish",
-            "containment_actions": {
-                "isolated_hosts": ["host_id"],
-                "blocked_domains": ["domain"],
-                "reset_users": ["user_id"],
-            },
-        },
+        "report_schema": REPORT_SCHEMA,
     }
     return json.dumps(payload, sort_keys=True)
@@ -0,0 +1,50 @@
+import os
+
+from server.environment import OpenSecEnvironment
+from server.models import AgentAction
+
+
+def _env(tmp_path) -> OpenSecEnvironment:
+    os.environ["OPENSEC_DISABLE_ENV_LOAD"] = "1"
+    return OpenSecEnvironment(sqlite_dir=str(tmp_path))
+
+
+def test_step_after_close_continues_episode(tmp_path):
+    env = _env(tmp_path)
+    reset = env.reset()
+    email_id = reset.observation.new_emails[0]
+    env.close()
+
+    result = env.step(AgentAction(action_type="fetch_email", params={"email_id": email_id}))
+    assert result.observation.last_action_result.ok
+    assert result.observation.step_index == 1
+    assert email_id in result.observation.evidence_content_ids
+    env.close()
+
+
+def test_reset_after_close_starts_new_episode(tmp_path):
+    env = _env(tmp_path)
+    env.reset()
+    env.step(AgentAction(action_type="isolate_host", params={"host_id": "h-001"}))
+    first_episode = env.episode_id
+    cache = env.cache
+    env.close()
+    assert env.cache is None
+    assert cache._closed
+
+    reset = env.reset()
+    assert env.episode_id != first_episode
+    assert reset.observation.step_index == 0
+    assert reset.observation.new_emails
+    result = env.step(AgentAction(action_type="query_logs", params={"sql": "SELECT 1"}))
+    assert result.observation.step_index == 1
+    env.close()
+
+
+def test_episode_db_stays_a_single_file(tmp_path):
+    env = _env(tmp_path)
+    env.reset()
+    env.step(AgentAction(action_type="query_logs", params={"sql": "SELECT 1"}))
+    assert all(p.suffix == ".db" for p in tmp_path.iterdir())
+    env.close()
+    assert all(p.suffix == ".db" for p in tmp_path.iterdir())
@@ -74,3 +74,396 @@ def test_replay_cache_roundtrip(tmp_path: Path):
             os.environ["OPENSEC_REPLAY_MODE"] = prior_mode
 
     assert decision2 == decision
+
+
+def test_replay_cache_buffers_writes_until_flush(tmp_path: Path):
+    db_path = tmp_path / "cache.db"
+    _init_db(db_path)
+
+    # A long interval keeps the background writer from committing on its own
+    cache = ReplayCache(str(db_path), flush_threshold=64, flush_interval=60.0)
+    decision = {"action_type": "recon", "params": {}}
+
+    def _stored_rows() -> int:
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM attacker_decisions").fetchone()[0]
+
+    cache.set("seed-001", 0, "phish_sent", "a", "none", decision, "mock", 0.0)
+    cache.set("seed-001", 1, "phish_sent", "a", "none", decision, "mock", 0.0)
+    assert cache.get("seed-001", 0, "phish_sent", "a", "none") == decision
+    assert _stored_rows() == 0
+
+    cache.flush()
+    assert _stored_rows() == 2
+
+    cache.set("seed-001", 2, "phish_sent", "a", "none", decision, "mock", 0.0)
+    cache.close()
+    assert _stored_rows() == 3
+
+
+def test_replay_cache_writer_commits_in_background(tmp_path: Path):
+    import time
+
+    db_path = tmp_path / "cache.db"
+    _init_db(db_path)
+
+    cache = ReplayCache(str(db_path), flush_threshold=2, flush_interval=60.0)
+    decision = {"action_type": "recon", "params": {}}
+    cache.set("seed-001", 0, "phish_sent", "a", "none", decision, "mock", 0.0)
+    cache.set("seed-001", 1, "phish_sent", "a", "none", decision, "mock", 0.0)
+
+    deadline = time.monotonic() + 5
+    while cache._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not cache._pending
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM attacker_decisions").fetchone()[0] == 2
+    cache.close()
+
+
+def test_replay_cache_idle_writer_exits_and_cache_is_collected(tmp_path: Path):
+    import gc
+    import time
+    import weakref
+
+    db_path = tmp_path / "cache.db"
+    _init_db(db_path)
+
+    cache = ReplayCache(str(db_path), flush_threshold=1)
+    cache.set("seed-001", 0, "phish_sent", "a", "none", {"action_type": "recon", "params": {}}, "mock", 0.0)
+    deadline = time.monotonic() + 5
+    while cache._writer is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache._writer is None
+
+    ref = weakref.ref(cache)
+    del cache
+    gc.collect()
+    assert ref() is None
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM attacker_decisions").fetchone()[0] == 1
+
+
+def test_replay_cache_writer_failure_surfaces_on_next_call(tmp_path: Path, caplog):
+    import logging
+    import time
+
+    import pytest
+
+    db_path = tmp_path / "cache.db"
+    _init_db(db_path)
+    cache = ReplayCache(str(db_path), flush_threshold=1, flush_interval=0.01)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("ALTER TABLE attacker_decisions RENAME TO attacker_decisions_moved")
+
+    decision = {"action_type": "recon", "params": {}}
+    with caplog.at_level(logging.WARNING, logger="sim.attacker_policy"):
+        cache.set("seed-001", 0, "phish_sent", "a", "none", decision, "mock", 0.0)
+        deadline = time.monotonic() + 5
+        while cache._writer is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert cache._writer is None
+    assert any(r.levelno == logging.ERROR for r in caplog.records)
+
+    with pytest.raises(RuntimeError, match="replay_cache_write_failed") as exc_info:
+        cache.get("seed-001", 0, "phish_sent", "a", "none")
+    assert isinstance(exc_info.value.__cause__, sqlite3.Error)
+    with pytest.raises(RuntimeError, match="replay_cache_write_failed"):
+        cache.set("seed-001", 1, "phish_sent", "a", "none", decision, "mock", 0.0)
+
+    # Once the table is back, an explicit flush commits the buffered row and
+    # clears the error
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("ALTER TABLE attacker_decisions_moved RENAME TO attacker_decisions")
+    cache.flush()
+    assert cache.get("seed-001", 0, "phish_sent", "a", "none") == decision
+    cache.close()
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM attacker_decisions").fetchone()[0] == 1
+
+
+def test_replay_cache_memory_lru_evicts_oldest(tmp_path: Path):
+    db_path = tmp_path / "cache.db"
+    _init_db(db_path)
+
+    cache = ReplayCache(str(db_path), flush_threshold=1, mem_size=2)
+    for step in range(3):
+        cache.set("seed-001", step, "phish_sent", "a", "none", {"action_type": "recon", "params": {}}, "mock", 0.0)
+
+    assert len(cache._mem) == 2
+    assert ("seed-001", 0, "phish_sent", "a", "none") not in cache._mem
+    # Evicted keys are still served from SQLite
+    assert cache.get("seed-001", 0, "phish_sent", "a", "none") == {"action_type": "recon", "params": {}}
+    cache.close()
+
+
+def test_replay_reads_legacy_sha256_keys(tmp_path: Path):
+    import hashlib
+
+    db_path = tmp_path / "cache.db"
+    _init_db(db_path)
+
+    agent_action = {"action_type": "query_logs", "params": {"sql": "SELECT 1"}}
+    legacy_hash = hashlib.sha256(
+        json.dumps(agent_action, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+    assert hash_agent_action(agent_action) != legacy_hash
+
+    recorded = {"action_type": "recon", "params": {}}
+    cache = ReplayCache(str(db_path))
+    cache.set("seed-001", 0, "phish_sent", legacy_hash, "none", recorded, "mock", 0.0)
+
+    class _FailPolicy(MockAttackerPolicy):
+        def choose_action(self, *args, **kwargs):
+            raise AssertionError("policy should not run on a replay hit")
+
+    scenario = json.loads(Path("data/seeds/sample_seed.json").read_text())
+    prior_mode = os.environ.get("OPENSEC_REPLAY_MODE")
+    os.environ["OPENSEC_REPLAY_MODE"] = "replay"
+    try:
+        decision = AttackerPolicyManager(cache=cache).decide(
+            scenario_id="seed-001",
+            step=0,
+            attacker_state="phish_sent",
+            agent_action=agent_action,
+            policy=_FailPolicy(),
+            scenario=scenario,
+        )
+    finally:
+        if prior_mode is None:
+            os.environ.pop("OPENSEC_REPLAY_MODE", None)
+        else:
+            os.environ["OPENSEC_REPLAY_MODE"] = prior_mode
+
+    assert decision == recorded
+    cache.close()
+
+
+def test_cache_key_hash_matches_canonical_json():
+    import hashlib
+
+    from sim.attacker_policy import canonical_json
+
+    action = {"params": {"sql": "SELECT * FROM alerts WHERE note = 'é'"}, "action_type": "query_logs"}
+    expected = hashlib.blake2b(canonical_json(action).encode("utf-8"), digest_size=16).hexdigest()
+    assert hash_agent_action(action) == expected
+
+
+def test_canonical_json_escapes_non_ascii():
+    from sim.attacker_policy import canonical_json
+
+    assert canonical_json({"b": "é", "a": 1}) == '{"a":1,"b":"\\u00e9"}'
+
+
+def test_cache_key_hash_does_not_depend_on_orjson(monkeypatch):
+    import hashlib
+
+    import sim.attacker_policy as attacker_policy
+    from sim.attacker_policy import canonical_json
+
+    # Floats and non-finite values are where JSON encoders disagree
+    action = {"action_type": "query_logs", "params": {"small": 1e-05, "big": 1e300, "nan": float("nan"), "inf": float("-inf")}}
+    expected = hashlib.blake2b(canonical_json(action).encode("utf-8"), digest_size=16).hexdigest()
+    assert hash_agent_action(action) == expected
+    assert hash_attacker_context(action["params"]) == hashlib.blake2b(
+        canonical_json(action["params"]).encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+    monkeypatch.setattr(attacker_policy, "orjson", None)
+    attacker_policy._digest.cache_clear()
+    assert hash_agent_action(action) == expected
+
+
+def test_replay_audit_rejects_invalid_cached_decision(tmp_path: Path):
+    db_path = tmp_path / "cache.db"
+    _init_db(db_path)
+
+    agent_action = {"action_type": "query_logs", "params": {"sql": "SELECT 1"}}
+    bogus = {"action_type": "reuse_credentials", "params": {"user": "nobody", "host": "nowhere"}}
+    cache = ReplayCache(str(db_path))
+    cache.set("seed-001", 0, "phish_sent", hash_agent_action(agent_action), "none", bogus, "mock", 0.0)
+
+    scenario = json.loads(Path("data/seeds/sample_seed.json").read_text())
+    manager = AttackerPolicyManager(cache=cache)
+    kwargs = dict(
+        scenario_id="seed-001",
+        step=0,
+        attacker_state="phish_sent",
+        agent_action=agent_action,
+        policy=MockAttackerPolicy(),
+        scenario=scenario,
+    )
+    prior = {k: os.environ.get(k) for k in ("OPENSEC_REPLAY_MODE", "OPENSEC_VALIDATE_REPLAY")}
+    os.environ["OPENSEC_REPLAY_MODE"] = "replay"
+    try:
+        assert manager.decide(**kwargs) == bogus
+        os.environ["OPENSEC_VALIDATE_REPLAY"] = "1"
+        assert manager.decide(**kwargs) == {"action_type": "no_op", "params": {}}
+    finally:
+        for key, value in prior.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    cache.close()
+
+
+def test_load_env_file_reads_once(tmp_path: Path):
+    from sim.attacker_policy import load_env_file, reset_env_cache
+
+    env_file = tmp_path / ".env"
+    env_file.write_text("OPENSEC_TEST_ENV_ONCE=first\n")
+    prior_disable = os.environ.pop("OPENSEC_DISABLE_ENV_LOAD", None)
+    try:
+        load_env_file(str(env_file))
+        assert os.environ["OPENSEC_TEST_ENV_ONCE"] == "first"
+
+        os.environ.pop("OPENSEC_TEST_ENV_ONCE")
+        load_env_file(str(env_file))
+        assert "OPENSEC_TEST_ENV_ONCE" not in os.environ
+
+        reset_env_cache()
+        load_env_file(str(env_file))
+        assert os.environ["OPENSEC_TEST_ENV_ONCE"] == "first"
+    finally:
+        os.environ.pop("OPENSEC_TEST_ENV_ONCE", None)
+        if prior_disable is not None:
+            os.environ["OPENSEC_DISABLE_ENV_LOAD"] = prior_disable
+        reset_env_cache()
+
+
+def test_load_env_file_reads_file_created_later(tmp_path: Path):
+    from sim.attacker_policy import load_env_file, reset_env_cache
+
+    env_file = tmp_path / ".env"
+    prior_disable = os.environ.pop("OPENSEC_DISABLE_ENV_LOAD", None)
+    try:
+        load_env_file(str(env_file))
+        assert "OPENSEC_TEST_ENV_LATER" not in os.environ
+
+        env_file.write_text("OPENSEC_TEST_ENV_LATER=late\n")
+        load_env_file(str(env_file))
+        assert os.environ["OPENSEC_TEST_ENV_LATER"] == "late"
+    finally:
+        os.environ.pop("OPENSEC_TEST_ENV_LATER", None)
+        if prior_disable is not None:
+            os.environ["OPENSEC_DISABLE_ENV_LOAD"] = prior_disable
+        reset_env_cache()
+
+
+def test_replay_cache_writes_to_legacy_text_id_table(tmp_path: Path):
+    db_path = tmp_path / "legacy.db"
+    legacy_schema = (
+        Path("schemas/sqlite_schema.sql")
+        .read_text()
+        .replace("decision_id INTEGER PRIMARY KEY", "decision_id TEXT PRIMARY KEY")
+        .replace("created_at INTEGER NOT NULL\n);\n\nCREATE UNIQUE INDEX IF NOT EXISTS idx_attacker_cache",
+                 "created_at TEXT NOT NULL\n);\n\nCREATE UNIQUE INDEX IF NOT EXISTS idx_attacker_cache")
+    )
+    assert "decision_id TEXT PRIMARY KEY" in legacy_schema
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(legacy_schema)
+
+    cache = ReplayCache(str(db_path), flush_threshold=1)
+    for step in range(3):
+        cache.set("seed-001", step, "phish_sent", "a", "none", {"action_type": "recon", "params": {}}, "mock", 0.0)
+    cache.close()
+
+    with sqlite3.connect(db_path) as conn:
+        ids = [row[0] for row in conn.execute("SELECT decision_id FROM attacker_decisions")]
+    assert len(ids) == 3
+    assert all(isinstance(i, str) and i for i in ids)
+    assert len(set(ids)) == 3
+
+
+def test_replay_cache_assigns_integer_decision_ids(tmp_path: Path):
+    db_path = tmp_path / "cache.db"
+    _init_db(db_path)
+
+    cache = ReplayCache(str(db_path), flush_threshold=1)
+    for step in range(2):
+        cache.set("seed-001", step, "phish_sent", "a", "none", {"action_type": "recon", "params": {}}, "mock", 0.0)
+    cache.close()
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT decision_id, created_at FROM attacker_decisions").fetchall()
+    assert [type(i) for i, _ in rows] == [int, int]
+    assert all(isinstance(ts, int) and ts > 1_600_000_000_000 for _, ts in rows)
+
+
+def test_decide_batch_only_queries_policy_for_misses(tmp_path: Path):
+    from sim.attacker_policy import AttackerRequest
+
+    db_path = tmp_path / "cache.db"
+    _init_db(db_path)
+    cache = ReplayCache(str(db_path))
+    scenario = json.loads(Path("data/seeds/sample_seed.json").read_text())
+
+    class _CountingPolicy(MockAttackerPolicy):
+        def __init__(self) -> None:
+            self.batches = []
+
+        def choose_action_batch(self, queries):
+            self.batches.append(len(queries))
+            return super().choose_action_batch(queries)
+
+    def _request(step: int) -> AttackerRequest:
+        return AttackerRequest(
+            scenario_id="seed-001",
+            step=step,
+            attacker_state="phish_sent",
+            agent_action={"action_type": "query_logs", "params": {"sql": f"SELECT {step}"}},
+            scenario=scenario,
+        )
+
+    policy = _CountingPolicy()
+    manager = AttackerPolicyManager(cache=cache)
+    prior_mode = os.environ.get("OPENSEC_REPLAY_MODE")
+    os.environ["OPENSEC_REPLAY_MODE"] = "replay"
+    try:
+        first = manager.decide(
+            scenario_id="seed-001",
+            step=1,
+            attacker_state="phish_sent",
+            agent_action=_request(1).agent_action,
+            policy=policy,
+            scenario=scenario,
+        )
+        batch = manager.decide_batch([_request(0), _request(1), _request(2)], policy)
+    finally:
+        if prior_mode is None:
+            os.environ.pop("OPENSEC_REPLAY_MODE", None)
+        else:
+            os.environ["OPENSEC_REPLAY_MODE"] = prior_mode
+
+    assert policy.batches == [1, 2]
+    assert batch[1] == first
+    assert all(d["action_type"] == "reuse_credentials" for d in batch)
+    cache.close()
+
+
+def test_replay_cache_adopts_table_created_after_open(tmp_path: Path):
+    db_path = tmp_path / "late.db"
+    cache = ReplayCache(str(db_path), flush_threshold=1)
+
+    # Created after the cache opened, from a schema that predates the cover
+    # index and uses TEXT decision ids
+    old_schema = (
+        Path("schemas/sqlite_schema.sql")
+        .read_text()
+        .replace("decision_id INTEGER PRIMARY KEY", "decision_id TEXT PRIMARY KEY")
+    )
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(old_schema)
+        conn.execute("DROP INDEX idx_attacker_cache_cover")
+
+    assert cache.get("seed-001", 0, "phish_sent", "a", "none") is None
+    decision = {"action_type": "recon", "params": {}}
+    cache.set("seed-001", 0, "phish_sent", "a", "none", decision, "mock", 0.0)
+    cache.close()
+
+    reopened = ReplayCache(str(db_path))
+    assert reopened.get("seed-001", 0, "phish_sent", "a", "none") == decision
+    reopened.close()
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT typeof(decision_id) FROM attacker_decisions").fetchone()[0] == "text"
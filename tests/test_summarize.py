@@ -0,0 +1,214 @@
+import json
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from scripts.summarize import GroupAccumulator, _ordered_keys, _tier_from_name, summarize
+
+
+def _reference_mean_std(values):
+    if not values:
+        return 0.0, 0.0
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, 0.0
+    var = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+    return mean, math.sqrt(var)
+
+
+def _reference_summary(path: Path, rows):
+    """summarize() for one file as computed before the streaming rewrite."""
+    n = len(rows)
+    rewards = [r.get("reward", 0.0) for r in rows]
+    steps = [r.get("step_count", 0) for r in rows]
+    diag = [r.get("diagnostics", {}) for r in rows]
+    fp_counts = [r.get("containment_false_positive_total", 0) for r in rows]
+    ttfc = [float(r["time_to_first_containment"]) for r in rows if r.get("time_to_first_containment") is not None]
+    blast = []
+    for r in rows:
+        fp = r.get("containment_false_positive_total", 0)
+        correct = r.get("containment_correct_total", 0)
+        if fp > 0 or correct > 0:
+            blast.append(fp / max(1, correct))
+    reward_mean, reward_std = _reference_mean_std(rewards)
+    step_mean, step_std = _reference_mean_std([float(s) for s in steps])
+    egar_mean, egar_std = _reference_mean_std([r.get("evidence_gated_action_rate", 0.0) for r in rows])
+    ttfc_mean, ttfc_std = _reference_mean_std(ttfc)
+    blast_mean, blast_std = _reference_mean_std(blast)
+    _, fp_rate_std = _reference_mean_std([1.0 if fp > 0 else 0.0 for fp in fp_counts])
+    tier = "unknown"
+    for name in ("trivial", "easy", "standard"):
+        if name in path.name:
+            tier = name
+            break
+    model = rows[0].get("model", "unknown")
+    return f"{model}|{tier}", {
+        "model": model,
+        "tier": tier,
+        "runs": n,
+        "reward_mean": reward_mean,
+        "reward_std": reward_std,
+        "reward_min": min(rewards),
+        "reward_max": max(rewards),
+        "step_mean": step_mean,
+        "step_std": step_std,
+        "step_min": min(steps),
+        "step_max": max(steps),
+        "report_submitted_rate": sum(1 for r in rows if r.get("submitted_report", False)) / n,
+        "evidence_seen_mean": sum(d.get("evidence_seen_count", 0) for d in diag) / n,
+        "evidence_content_mean": sum(d.get("evidence_content_count", 0) for d in diag) / n,
+        "containment_attempted_rate": sum(1 for d in diag if d.get("containment_attempted", False)) / n,
+        "egar_mean": egar_mean,
+        "egar_std": egar_std,
+        "ttfc_mean": ttfc_mean if ttfc else None,
+        "ttfc_std": ttfc_std if ttfc else None,
+        "blast_radius_mean": blast_mean if blast else None,
+        "blast_radius_std": blast_std if blast else None,
+        "fp_rate": sum(1 for fp in fp_counts if fp > 0) / n,
+        "fp_rate_std": fp_rate_std,
+        "inj_tier1_rate": sum(1 for r in rows if r.get("inj_tier1_violations", 0) > 0) / n,
+        "inj_tier2_rate": sum(1 for r in rows if r.get("inj_tier2_violations", 0) > 0) / n,
+        "inj_tier3_rate": sum(1 for r in rows if r.get("inj_tier3_violations", 0) > 0) / n,
+        "source_file": str(path),
+    }
+
+
+_FULL_ROWS = [
+    {
+        "model": "model-a",
+        "reward": 7.6,
+        "step_count": 4,
+        "submitted_report": True,
+        "diagnostics": {"containment_attempted": True, "evidence_seen_count": 3, "evidence_content_count": 2},
+        "details": {"injection": {"violations": ["inj-001"]}},
+        "evidence_gated_action_rate": 0.75,
+        "time_to_first_containment": 2,
+        "containment_false_positive_total": 1,
+        "containment_correct_total": 3,
+        "inj_tier1_violations": 1,
+    },
+    {
+        "model": "model-a",
+        "reward": -1.3,
+        "step_count": 15,
+        "submitted_report": False,
+        "diagnostics": {"containment_attempted": False, "evidence_seen_count": 7, "evidence_content_count": 1},
+        "evidence_gated_action_rate": 0.1,
+        "containment_false_positive_total": 0,
+        "containment_correct_total": 0,
+        "inj_tier3_violations": 2,
+    },
+    {
+        "model": "model-a",
+        "reward": 3.05,
+        "step_count": 9,
+        "submitted_report": True,
+        "diagnostics": {"containment_attempted": True, "evidence_seen_count": 5, "evidence_content_count": 4},
+        "evidence_gated_action_rate": 1.0,
+        "time_to_first_containment": 5,
+        "containment_false_positive_total": 2,
+        "containment_correct_total": 0,
+        "inj_tier2_violations": 1,
+    },
+]
+
+# Rows that omit every optional field
+_SPARSE_ROWS = [{"model": "model-b"}, {"model": "model-b", "reward": 1.5, "step_count": 3}]
+
+# Every streamed metric is constant, so every std must be exactly zero
+_CONSTANT_ROWS = [
+    {
+        "model": "model-c",
+        "reward": 0.1,
+        "step_count": 7,
+        "evidence_gated_action_rate": 0.7,
+        "time_to_first_containment": 3,
+        "containment_false_positive_total": 1,
+        "containment_correct_total": 3,
+    }
+] * 10
+
+# Large values with a small spread, where sum-of-squares variance cancels
+_LARGE_ROWS = [
+    {"model": "model-d", "reward": 1e6 + 0.1 * i, "step_count": 1_000_000 + i, "evidence_gated_action_rate": 0.5}
+    for i in range(4)
+]
+
+_STD_KEYS = ("reward_std", "step_std", "egar_std", "ttfc_std", "blast_radius_std", "fp_rate_std")
+
+
+def _write_jsonl(path: Path, rows) -> Path:
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    return path
+
+
+def test_summarize_matches_reference(tmp_path: Path):
+    full = _write_jsonl(tmp_path / "llm_baselines_trivial.jsonl", _FULL_ROWS)
+    sparse = _write_jsonl(tmp_path / "llm_baselines_standard.jsonl", _SPARSE_ROWS)
+    empty = _write_jsonl(tmp_path / "llm_baselines_easy.jsonl", [])
+    constant = _write_jsonl(tmp_path / "constant_trivial.jsonl", _CONSTANT_ROWS)
+    large = _write_jsonl(tmp_path / "large_easy.jsonl", _LARGE_ROWS)
+    files = ((full, _FULL_ROWS), (sparse, _SPARSE_ROWS), (constant, _CONSTANT_ROWS), (large, _LARGE_ROWS))
+
+    summary = summarize([full, sparse, empty, constant, large])
+
+    expected = dict(_reference_summary(path, rows) for path, rows in files)
+    assert list(summary) == list(expected)
+    for key, group in expected.items():
+        assert list(summary[key]) == list(group)
+        got = summary[key]
+        for name, want in group.items():
+            if name in _STD_KEYS and want is not None:
+                # Streaming moments round differently from two passes around 1e6
+                assert got[name] == pytest.approx(want, rel=1e-9, abs=1e-12), (key, name)
+            else:
+                assert got[name] == pytest.approx(want, rel=1e-12, abs=1e-12), (key, name)
+
+    for name in _STD_KEYS:
+        assert summary["model-c|trivial"][name] == 0.0
+
+
+def test_empty_group_has_no_metrics():
+    assert GroupAccumulator().metrics() == {}
+
+
+def test_tier_from_name_prefers_easier_tier():
+    assert _tier_from_name("llm_baselines_standard_trivial.jsonl") == "trivial"
+    assert _tier_from_name("llm_baselines_standard_easy.jsonl") == "easy"
+    assert _tier_from_name("llm_baselines_standard.jsonl") == "standard"
+    assert _tier_from_name("llm_baselines.jsonl") == "unknown"
+
+
+def test_ordered_keys_puts_unknown_last():
+    tiers = dict.fromkeys(["unknown", "standard", "trivial", "easy"])
+    assert _ordered_keys(tiers, "tier") == ["trivial", "easy", "standard", "unknown"]
+    families = dict.fromkeys(["unknown", "phishing", "credential_theft"])
+    assert _ordered_keys(families, "taxonomy_family") == ["credential_theft", "phishing", "unknown"]
+
+
+@pytest.mark.parametrize(
+    "rewards",
+    [[0.1] * 10, [0.7] * 3, [1e6, 1e6 + 0.1, 1e6 + 0.2, 1e6 + 0.3], [7.6, -1.3, 3.05, 0.0, 2.5]],
+)
+def test_merged_accumulators_match_two_pass_moments(rewards):
+    # Split the rows across three partial accumulators, as per-file reduction does
+    parts = [GroupAccumulator() for _ in range(3)]
+    for i, reward in enumerate(rewards):
+        parts[i % 3].update({"reward": reward})
+    merged = GroupAccumulator()
+    for part in parts:
+        merged.merge(part)
+
+    m = merged.metrics()
+    mean, std = _reference_mean_std(rewards)
+    assert m["episodes"] == len(rewards)
+    assert m["reward"] == pytest.approx(mean, rel=1e-15)
+    if len(set(rewards)) == 1:
+        assert m["reward_std"] == 0.0
+    else:
+        assert m["reward_std"] == pytest.approx(std, rel=1e-9)
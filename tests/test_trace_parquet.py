@@ -0,0 +1,73 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from eval_utils import TRACE_SUMMARY_COLUMNS, trace_summary_record, write_trace_parquet
+from scripts.summarize import _load_parquet, summarize
+
+_ROWS = [
+    {
+        "model": "model-a",
+        "seed_path": "data/seeds/eval/trivial-001_seed.json",
+        "reward": 7.6,
+        "step_count": 4,
+        "submitted_report": True,
+        "diagnostics": {"containment_attempted": True, "evidence_seen_count": 3, "evidence_content_count": 2},
+        "details": {"injection": {"violations": ["inj-001"]}},
+        "evidence_gated_action_rate": 0.75,
+        "time_to_first_containment": 2,
+        "containment_false_positive_total": 1,
+        "containment_correct_total": 3,
+        "inj_tier1_violations": 1,
+        "inj_tier2_violations": 0,
+        "inj_tier3_violations": 0,
+    },
+    # Missing optional fields take the trace_summary_record defaults
+    {"model": "model-a", "reward": -0.5, "step_count": 15},
+]
+
+
+def test_parquet_traces_round_trip(tmp_path: Path):
+    pytest.importorskip("pyarrow")
+
+    jsonl_path = tmp_path / "llm_baselines_trivial.jsonl"
+    jsonl_path.write_text("".join(json.dumps(r) + "\n" for r in _ROWS))
+    parquet_path = tmp_path / "llm_baselines_trivial.parquet"
+    write_trace_parquet([trace_summary_record(r) for r in _ROWS], parquet_path)
+
+    rows = _load_parquet(parquet_path)
+    assert len(rows) == len(_ROWS)
+    assert rows[0]["diagnostics"]["evidence_seen_count"] == 3
+    assert rows[0]["details"]["injection"]["violations"] is True
+    assert rows[1]["time_to_first_containment"] is None
+    assert set(rows[0]) == {name for name, _ in TRACE_SUMMARY_COLUMNS} - {
+        "containment_attempted",
+        "evidence_seen_count",
+        "evidence_content_count",
+        "injection_violated",
+    } | {"diagnostics", "details"}
+
+    from_jsonl = summarize([jsonl_path])
+    from_parquet = summarize([parquet_path])
+    assert list(from_parquet) == list(from_jsonl)
+    for key, group in from_jsonl.items():
+        group["source_file"] = str(parquet_path)
+        assert from_parquet[key] == pytest.approx(group)
+
+
+def test_parquet_without_pyarrow_exits_with_hint(tmp_path: Path, monkeypatch):
+    # A None entry in sys.modules makes the import raise ImportError
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+
+    with pytest.raises(SystemExit, match="pip install pyarrow"):
+        write_trace_parquet([trace_summary_record(r) for r in _ROWS], tmp_path / "traces.parquet")
+    parquet_path = tmp_path / "traces.parquet"
+    parquet_path.write_bytes(b"")
+    with pytest.raises(SystemExit, match="pip install pyarrow"):
+        _load_parquet(parquet_path)
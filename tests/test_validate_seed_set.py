@@ -0,0 +1,68 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from scripts import validate_seed_set
+
+
+def test_duplicate_scenario_ids_compile_without_collisions(tmp_path: Path, monkeypatch, capsys):
+    seed = json.loads(Path("data/seeds/sample_seed.json").read_text())
+    broken = dict(seed, patient_zero_host="h-missing")
+    broken_path = tmp_path / "broken_seed.json"
+    broken_path.write_text(json.dumps(broken))
+
+    seed_paths = ["data/seeds/sample_seed.json", str(broken_path)] + ["data/seeds/sample_seed.json"] * 4
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps({"train": [{"seed_path": p} for p in seed_paths], "eval": []}))
+    db_dir = tmp_path / "db"
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["validate_seed_set.py", "--manifest", str(manifest_path), "--split", "train", "--db-dir", str(db_dir)],
+    )
+    assert validate_seed_set.main() == 1
+
+    # One DB per scenario_id and no leftover worker files
+    assert [p.name for p in db_dir.iterdir()] == [f"{seed['scenario_id']}.db"]
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [
+        "ERROR: patient_zero_host not in entities.hosts",
+        "Validation failed with 1 error(s)",
+    ]
+
+
+def test_aborted_run_leaves_no_temp_files(tmp_path: Path, monkeypatch):
+    seed = json.loads(Path("data/seeds/sample_seed.json").read_text())
+    missing = str(tmp_path / "missing_seed.json")
+    seed_paths = ["data/seeds/sample_seed.json", missing] + ["data/seeds/sample_seed.json"] * 4
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps({"train": [{"seed_path": p} for p in seed_paths], "eval": []}))
+    db_dir = tmp_path / "db"
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["validate_seed_set.py", "--manifest", str(manifest_path), "--split", "train", "--db-dir", str(db_dir)],
+    )
+    with pytest.raises(FileNotFoundError):
+        validate_seed_set.main()
+
+    # DBs compiled after the failing seed are never moved into place
+    assert [p.name for p in db_dir.iterdir()] == [f"{seed['scenario_id']}.db"]
+
+
+def test_interrupted_compile_removes_temp_file(tmp_path: Path, monkeypatch):
+    def interrupted(seed_path, db_path):
+        Path(db_path).write_bytes(b"partial")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(validate_seed_set, "compile_seed", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        validate_seed_set._check_seed(Path("data/seeds/sample_seed.json"), tmp_path, tmp_path)
+    assert list(tmp_path.iterdir()) == []